@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare per-page allocations of the old PIL/OpenCV chain and PageImage"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from page_image import PageImage
+from layout import analyze_layout
+
+def make_page(width=2550, height=3300):
+    """Synthetic US Letter page at 300 DPI with a few text-like lines"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for row in range(60):
+        y = 200 + row * 48
+        draw.rectangle([200, y, width - 200 - (row % 7) * 150, y + 20], fill=(30, 30, 30))
+    return image
+
+def legacy_pipeline(image):
+    """Conversions the pipeline used to make for one page"""
+    image = ImageEnhance.Contrast(image).enhance(1.2)
+    image = ImageEnhance.Sharpness(image).enhance(1.1)
+    analyze_layout(np.array(image))
+    bgr = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    processed = Image.fromarray(cv2.convertScaleAbs(gray, alpha=1.2, beta=10))
+    # EasyOCR input
+    cv2.cvtColor(np.array(processed), cv2.COLOR_GRAY2BGR)
+    return processed
+
+def page_image_pipeline(image):
+    """Same stages on a single PageImage buffer"""
+    page = PageImage.from_pil(image)
+    enhanced, processed = page.enhance(contrast=1.2, sharpness=1.1)
+    analyze_layout(enhanced)
+    return processed
+
+def measure(name, pipeline, image, runs=5):
+    pipeline(image)  # Warm up lazy imports and OpenCV buffers
+
+    # numpy buffers are traced, PIL's own allocations are not, so the
+    # legacy figure is a lower bound
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(runs):
+        pipeline(image)
+    elapsed = (time.perf_counter() - start) / runs
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<12} peak {peak / 1024 / 1024:8.1f} MB   {elapsed * 1000:8.1f} ms/page")
+    return peak, elapsed
+
+def main():
+    image = make_page()
+    print(f"Page: {image.size[0]}x{image.size[1]} RGB "
+          f"({image.size[0] * image.size[1] * 3 / 1024 / 1024:.1f} MB decoded)\n")
+
+    legacy_peak, legacy_time = measure("legacy", legacy_pipeline, image)
+    page_peak, page_time = measure("PageImage", page_image_pipeline, image)
+
+    print(f"\nPeak allocation: {legacy_peak / max(page_peak, 1):.1f}x lower, "
+          f"time: {legacy_time / max(page_time, 1e-9):.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Measure start-up time of the CLI and API and which heavy modules they load"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+SRC = ROOT / "src"
+
+# Modules that take seconds to import and must only load when a feature needs them
+HEAVY_MODULES = ('torch', 'easyocr', 'sentence_transformers', 'scipy', 'skimage',
+                 'pyarrow', 'kagglehub', 'openai')
+
+REPORT_HEAVY = (
+    "import sys, json; print(json.dumps(sorted(m for m in {modules!r} if m in sys.modules)))"
+)
+
+SCENARIOS = {
+    'cli --help': [str(ROOT / 'ocr_tool.py'), '--help'],
+    'import main': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); import main; "
+                          + REPORT_HEAVY.format(modules=HEAVY_MODULES)],
+    'tesseract processor': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); import main; "
+                                  "import tempfile; main.OCRProcessor(ocr_engine='tesseract', output_dir=tempfile.mkdtemp()); "
+                                  + REPORT_HEAVY.format(modules=HEAVY_MODULES)],
+    'import api': ['-c', f"import sys; sys.path.insert(0, {str(SRC)!r}); import api; "
+                         + REPORT_HEAVY.format(modules=HEAVY_MODULES)],
+}
+
+def run(args, runs):
+    """Median wall time of a fresh interpreter running args, plus its last output line"""
+    timings, output = [], ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable] + args, capture_output=True, text=True, cwd=ROOT)
+        timings.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            return None, completed.stderr.strip().splitlines()[-1:]
+        output = completed.stdout.strip().splitlines()[-1:] if completed.stdout.strip() else []
+    return statistics.median(timings), output
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI and API start-up time')
+    parser.add_argument('--runs', type=int, default=5, help='Interpreter starts per scenario')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    baseline, _ = run(['-c', 'pass'], args.runs)
+    print(f"{'python -c pass':<22} {baseline:6.3f}s")
+
+    results = {'interpreter': baseline}
+    for name, scenario in SCENARIOS.items():
+        seconds, output = run(scenario, args.runs)
+        results[name] = seconds
+        if seconds is None:
+            print(f"{name:<22}  failed: {' '.join(output)}")
+            continue
+        heavy = ''
+        if output and output[0].startswith('['):
+            heavy = f"  heavy modules: {', '.join(json.loads(output[0])) or 'none'}"
+        print(f"{name:<22} {seconds:6.3f}s{heavy}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
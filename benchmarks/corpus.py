@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Generate the fixed synthetic document corpus used by run_benchmarks.py"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# Bump when the generated documents change, so results of different corpora aren't compared
+CORPUS_VERSION = 1
+
+VENDORS = ["ABC Corporation", "Northwind Traders", "Globex Ltd", "Initech LLC", "Umbrella Supplies"]
+CUSTOMERS = ["XYZ Company", "Acme Retail", "Stark Industries", "Wayne Logistics", "Hooli Inc"]
+ITEMS = ["Consulting services", "Software license", "Hardware maintenance", "Training session",
+         "Cloud hosting", "Support contract", "Office supplies", "Travel expenses"]
+WORDS = ("the quarterly report shows revenue growth across all regions while operating costs "
+         "remained stable and the board approved the budget for the next fiscal year including "
+         "investments in infrastructure research and customer support").split()
+
+def load_font(size):
+    """DejaVu Sans when installed, otherwise PIL's built-in font"""
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+def font_name():
+    try:
+        ImageFont.truetype("DejaVuSans.ttf", 12)
+        return "DejaVuSans"
+    except OSError:
+        return "PIL default"
+
+def invoice_page(rng, number, dpi=150):
+    """US Letter invoice with a header, addresses and a line item table"""
+    scale = dpi / 100
+    width, height = int(850 * scale), int(1100 * scale)
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    large, medium, small = load_font(int(28 * scale)), load_font(int(16 * scale)), load_font(int(13 * scale))
+
+    x, y = int(60 * scale), int(60 * scale)
+    draw.text((x, y), "INVOICE", fill=0, font=large)
+    y += int(60 * scale)
+    for line in [rng.choice(VENDORS), f"{rng.randint(10, 999)} Business Street",
+                 f"Phone: (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}"]:
+        draw.text((x, y), line, fill=0, font=medium)
+        y += int(24 * scale)
+
+    y += int(20 * scale)
+    draw.text((x, y), f"BILL TO: {rng.choice(CUSTOMERS)}", fill=0, font=medium)
+    y += int(30 * scale)
+    draw.text((x, y), f"Invoice #: INV-2024-{number:04d}", fill=0, font=medium)
+    y += int(24 * scale)
+    draw.text((x, y), f"Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", fill=0, font=medium)
+    y += int(50 * scale)
+
+    columns = [x, int(420 * scale), int(520 * scale), int(640 * scale)]
+    for column, title in zip(columns, ["DESCRIPTION", "QTY", "RATE", "AMOUNT"]):
+        draw.text((column, y), title, fill=0, font=medium)
+    y += int(28 * scale)
+    draw.line([(x, y), (width - x, y)], fill=0, width=2)
+    y += int(12 * scale)
+
+    total = 0.0
+    for _ in range(rng.randint(3, 8)):
+        qty, rate = rng.randint(1, 20), rng.randint(10, 500)
+        total += qty * rate
+        for column, value in zip(columns, [rng.choice(ITEMS), str(qty), f"${rate:.2f}", f"${qty * rate:,.2f}"]):
+            draw.text((column, y), value, fill=0, font=small)
+        y += int(24 * scale)
+
+    y += int(30 * scale)
+    draw.text((columns[2], y), f"TOTAL: ${total:,.2f}", fill=0, font=medium)
+    return image
+
+def report_page(rng, page_number, dpi=150):
+    """Dense two-column text page"""
+    scale = dpi / 100
+    width, height = int(850 * scale), int(1100 * scale)
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    title, body = load_font(int(22 * scale)), load_font(int(12 * scale))
+
+    margin = int(60 * scale)
+    draw.text((margin, margin), f"Quarterly Report - Section {page_number}", fill=0, font=title)
+    column_width = (width - 3 * margin) // 2
+    for column in range(2):
+        x = margin + column * (column_width + margin)
+        y = margin + int(60 * scale)
+        while y < height - margin - int(20 * scale):
+            words, line = rng.randint(5, 8), []
+            for _ in range(words):
+                line.append(rng.choice(WORDS))
+            draw.text((x, y), ' '.join(line), fill=0, font=body)
+            y += int(18 * scale)
+    return image
+
+def noisy_scan(rng, image):
+    """Photocopy look: slight skew, blur, gray background and sensor noise"""
+    np_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    image = image.rotate(rng.uniform(-2.0, 2.0), resample=Image.BILINEAR, fillcolor=235)
+    image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.6, 1.2)))
+    pixels = np.asarray(image, dtype=np.float32) * 0.85 + 20
+    pixels += np_rng.normal(0, 14, pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+def blank_page(rng, dpi=150, specks=True):
+    """Empty page, optionally with a few scanner specks"""
+    scale = dpi / 100
+    image = Image.new('L', (int(850 * scale), int(1100 * scale)), 255)
+    if specks:
+        draw = ImageDraw.Draw(image)
+        for _ in range(rng.randint(3, 10)):
+            x, y = rng.randint(0, image.width - 4), rng.randint(0, image.height - 4)
+            draw.ellipse([x, y, x + rng.randint(1, 3), y + rng.randint(1, 3)], fill=rng.randint(80, 200))
+    return image
+
+def build_documents(rng, scale):
+    """(file name, kind, list of page images) for every corpus document"""
+    documents = []
+    for i in range(4 * scale):
+        documents.append((f"invoice_{i:03d}.png", 'image', [invoice_page(rng, i)]))
+    for i in range(3 * scale):
+        documents.append((f"noisy_{i:03d}.jpg", 'noisy', [noisy_scan(rng, invoice_page(rng, 100 + i))]))
+    for i in range(2 * scale):
+        documents.append((f"blank_{i:03d}.png", 'blank', [blank_page(rng, specks=bool(i % 2))]))
+    for i in range(scale):
+        pages = [report_page(rng, n) for n in range(1, 4)]
+        documents.append((f"report_{i:03d}.pdf", 'pdf', pages))
+        # Mixed PDF: invoice, blank separator sheet, noisy scan
+        pages = [invoice_page(rng, 200 + i), blank_page(rng), noisy_scan(rng, report_page(rng, 1))]
+        documents.append((f"mixed_{i:03d}.pdf", 'pdf', pages))
+        pages = [invoice_page(rng, 300 + i, dpi=200).convert('1') for _ in range(3)]
+        documents.append((f"fax_{i:03d}.tiff", 'tiff', pages))
+    return documents
+
+def save_document(path, pages):
+    if path.suffix == '.pdf':
+        # Fixed dates keep the bytes, and so the corpus digest, reproducible
+        stamp = time.gmtime(1704067200)
+        pages[0].save(path, save_all=True, append_images=pages[1:], resolution=150,
+                      creationDate=stamp, modDate=stamp)
+    elif path.suffix == '.tiff':
+        pages[0].save(path, save_all=True, append_images=pages[1:], compression='group4', dpi=(200, 200))
+    elif path.suffix == '.jpg':
+        pages[0].save(path, quality=80)
+    else:
+        pages[0].save(path)
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def build_corpus(output_dir, scale=1, seed=1234):
+    """
+    Write the corpus, or reuse it if it was already generated with the same parameters
+
+    Args:
+        output_dir (str): Corpus directory
+        scale (int): Multiplies the number of documents of every kind
+        seed (int): Random seed, the same seed always gives the same documents
+
+    Returns:
+        dict: Corpus manifest: version, parameters, digest and per-file kind and page count
+    """
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / 'corpus.json'
+    params = {'version': CORPUS_VERSION, 'scale': scale, 'seed': seed, 'font': font_name()}
+
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if {key: manifest.get(key) for key in params} == params and all(
+                (output_dir / entry['file']).exists() for entry in manifest['files']):
+            return manifest
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    files = []
+    for name, kind, pages in build_documents(rng, scale):
+        path = output_dir / name
+        save_document(path, pages)
+        files.append({'file': name, 'kind': kind, 'pages': len(pages), 'sha256': file_digest(path)})
+
+    # Pixel content is seeded; the digest lets results from different corpora be told apart
+    digest = hashlib.sha256(''.join(entry['sha256'] for entry in files).encode()).hexdigest()
+    manifest = {**params, 'digest': digest, 'files': files,
+                'pages': sum(entry['pages'] for entry in files)}
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the synthetic benchmark corpus')
+    parser.add_argument('--output', default='benchmarks/corpus', help='Corpus directory')
+    parser.add_argument('--scale', type=int, default=1, help='Multiplier for the number of documents')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed')
+    args = parser.parse_args()
+
+    manifest = build_corpus(args.output, args.scale, args.seed)
+    print(f"{len(manifest['files'])} files, {manifest['pages']} pages in {args.output} "
+          f"(digest {manifest['digest'][:12]})")
+
+if __name__ == "__main__":
+    main()
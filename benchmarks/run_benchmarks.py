@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Reproducible OCR pipeline benchmark
+
+Runs every engine/mode configuration against the synthetic corpus from
+corpus.py, each in a fresh interpreter so model loading and peak memory
+don't leak between configurations, and writes the results as JSON.
+
+Two passes per configuration:
+  end_to_end  the real pipeline (iter_batch_results): pages/sec, document
+              and page latency percentiles, peak RSS
+  stages      the same stages called one at a time: rasterize, blank check,
+              preprocess, layout, OCR per page; embed, classify, extract per document
+
+Usage:
+  python benchmarks/run_benchmarks.py --output results.json
+  python benchmarks/run_benchmarks.py --baseline baseline.json --fail-on-regression
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import build_corpus
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CONFIGS = {
+    'tesseract/fixed': {'ocr_engine': 'tesseract'},
+    'tesseract/progressive': {'ocr_engine': 'tesseract', 'dpi_mode': 'progressive'},
+    'tesseract/regions': {'ocr_engine': 'tesseract', 'region_ocr': True},
+    'tesseract/exhaustive': {'ocr_engine': 'tesseract', 'tesseract_mode': 'exhaustive'},
+    'tesseract-api/fixed': {'ocr_engine': 'tesseract-api'},
+    'easyocr/fixed': {'ocr_engine': 'easyocr'},
+    'cascade/fixed': {'ocr_engine': 'cascade'},
+}
+
+STAGE_ORDER = ('rasterize', 'blank_check', 'preprocess', 'layout', 'ocr', 'embed', 'classify', 'extract')
+
+def percentiles(samples):
+    """Latency summary in milliseconds"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        'count': len(samples),
+        'total_s': round(float(values.sum()) / 1000, 4),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+    }
+
+def peak_rss_mb():
+    """Lifetime peak RSS of this process"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return round((max_rss if sys.platform == 'darwin' else max_rss * 1024) / 1024 / 1024, 1)
+
+class StageTimer:
+    """Collects wall time samples per stage"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        yield
+        self.samples[stage].append(time.perf_counter() - start)
+
+    def summary(self):
+        return {stage: percentiles(self.samples[stage]) for stage in STAGE_ORDER if self.samples[stage]}
+
+# --- Worker side: one configuration in this interpreter -----------------------
+
+def iter_pages(ocr, path, timer):
+    """Decode a corpus file page by page, timing each decode as 'rasterize'"""
+    from page_image import PageImage, get_frame_count, iter_image_frames
+    from pdf_pages import iter_pdf_pages
+
+    if path.suffix == '.pdf':
+        pages = iter_pdf_pages(str(path), dpi=ocr.dpi)
+    elif path.suffix == '.tiff' and get_frame_count(path) > 1:
+        pages = iter_image_frames(path)
+    else:
+        pages = iter([(1, None)])
+
+    while True:
+        start = time.perf_counter()
+        try:
+            page_number, image = next(pages)
+        except StopIteration:
+            return
+        if image is None:
+            image = PageImage.open(path)
+        timer.samples['rasterize'].append(time.perf_counter() - start)
+        yield page_number, image
+
+def ocr_page_stages(ocr, image, timer):
+    """The per-page stages of OCRProcessor._ocr_page, timed one by one"""
+    from layout import analyze_layout, is_blank_page
+
+    with timer.time('blank_check'):
+        blank = is_blank_page(image.gray, ocr.blank_sensitivity)
+    if blank:
+        return ""
+
+    with timer.time('preprocess'):
+        enhanced, processed = image.enhance(contrast=1.2)
+    with timer.time('layout'):
+        layout_type, regions = analyze_layout(enhanced, with_regions=ocr.region_ocr)
+
+    with timer.time('ocr'):
+        if ocr.use_regions(regions):
+            text, _, _ = ocr.ocr_regions(processed, regions)
+        elif ocr.engine.family == 'tesseract':
+            text, _, _ = ocr._tesseract(processed, layout_type)
+        else:
+            text, _, _ = ocr._easyocr(processed)
+    return text
+
+def load_nlp(db_dir):
+    """Vector database and entity extractor, or the reason they can't be benchmarked"""
+    try:
+        from vector_db import VectorDatabase
+        from entity_extractor import LocalEntityExtractor
+        start = time.perf_counter()
+        vector_db = VectorDatabase(db_dir)
+        return vector_db, LocalEntityExtractor(), time.perf_counter() - start, None
+    except Exception as e:
+        return None, None, None, f"{type(e).__name__}: {e}"
+
+def run_stages(ocr, files, timer, skip_nlp):
+    """Stage pass over the corpus; returns NLP model load time and any skip reason"""
+    vector_db, extractor, model_load, skipped = (None, None, None, 'disabled') if skip_nlp else \
+        load_nlp(tempfile.mkdtemp(prefix='bench_db_'))
+
+    for path in files:
+        texts = [ocr_page_stages(ocr, image, timer) for _, image in iter_pages(ocr, path, timer)]
+        text = '\n\n'.join(t for t in texts if t.strip())
+        if vector_db is None or not text.strip():
+            continue
+
+        with timer.time('embed'):
+            vector_db.add_documents([text], [str(path)])
+        with timer.time('classify'):
+            matches = vector_db.search_similar(text, k=1)
+            doc_type = matches[0][0].document_type if matches else vector_db._detect_document_type(text)
+        with timer.time('extract'):
+            asyncio.run(extractor.extract_entities(text, doc_type))
+
+    return model_load, skipped
+
+def run_end_to_end(ocr, files):
+    """Real batch pipeline over the corpus"""
+    page_seconds, document_seconds, pages, errors = [], [], 0, 0
+    start = time.perf_counter()
+    for _, result in ocr.iter_batch_results(files):
+        if 'error' in result.metadata:
+            errors += 1
+            continue
+        pages += max(1, len(result.pages))
+        document_seconds.append(result.metadata.get('seconds', 0.0))
+        page_seconds.extend(page.seconds for page in result.pages if page.seconds is not None)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'documents': len(files),
+        'errors': errors,
+        'pages': pages,
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 3) if elapsed else 0.0,
+        'document_latency': percentiles(document_seconds) if document_seconds else None,
+        'page_latency': percentiles(page_seconds) if page_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_config(name, corpus_dir, skip_nlp):
+    """Benchmark one configuration in this process"""
+    import main as ocr_main
+
+    corpus_dir = Path(corpus_dir)
+    manifest = json.loads((corpus_dir / 'corpus.json').read_text())
+    files = [corpus_dir / entry['file'] for entry in manifest['files']]
+    settings = {**CONFIGS[name], 'output_dir': tempfile.mkdtemp(prefix='bench_out_'), 'cache_dir': None}
+
+    start = time.perf_counter()
+    ocr = ocr_main.OCRProcessor(**settings)
+    # Fail fast with the real reason when the engine can't run here
+    ocr.engine.image_to_data(np.full((64, 64), 255, dtype=np.uint8))
+    engine_load = time.perf_counter() - start
+
+    # End-to-end first, so its peak RSS isn't inflated by the stage pass
+    end_to_end = run_end_to_end(ocr, files)
+    if end_to_end['errors'] == len(files):
+        raise RuntimeError("every document failed, see the worker log")
+
+    timer = StageTimer()
+    model_load, nlp_skipped = run_stages(ocr, files, timer, skip_nlp)
+    ocr.close()
+
+    result = {
+        'settings': {key: value for key, value in ocr.get_settings().items() if key != 'output_dir'},
+        'engine_load_seconds': round(engine_load, 3),
+        'end_to_end': end_to_end,
+        'stages': timer.summary(),
+    }
+    if model_load is not None:
+        result['embedding_model_load_seconds'] = round(model_load, 3)
+    if nlp_skipped:
+        result['nlp_skipped'] = nlp_skipped
+    return result
+
+# --- Parent side: corpus, workers, report, baseline ---------------------------
+
+def run_worker(name, corpus_dir, skip_nlp):
+    """Run one configuration in a fresh interpreter"""
+    command = [sys.executable, __file__, '--worker', name, '--corpus', str(corpus_dir)]
+    if skip_nlp:
+        command.append('--skip-nlp')
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = completed.stderr.strip().splitlines()[-1:] or ['worker failed']
+        return {'error': error[0]}
+    return json.loads(lines[-1])
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_result(name, result):
+    if 'error' in result:
+        print(f"\n{name}: skipped ({result['error']})")
+        return
+    e2e = result['end_to_end']
+    print(f"\n{name}: {e2e['pages_per_sec']:.2f} pages/sec, {e2e['pages']} pages in {e2e['seconds']:.1f}s, "
+          f"peak RSS {e2e['peak_rss_mb']} MB, {e2e['errors']} errors")
+    print(f"  {'stage':<12} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for stage, summary in result['stages'].items():
+        print(f"  {stage:<12} {summary['count']:>6} {summary['p50_ms']:>10.2f} "
+              f"{summary['p95_ms']:>10.2f} {summary['p99_ms']:>10.2f}")
+    if result.get('nlp_skipped'):
+        print(f"  embed/classify/extract skipped: {result['nlp_skipped']}")
+
+def compare(current, baseline, tolerance):
+    """
+    Compare results against a stored baseline
+
+    Throughput may not drop, and peak memory and stage p95 latency may not
+    grow, by more than ``tolerance`` (a fraction). Stages under a
+    millisecond are left out, their timings are mostly noise.
+
+    Returns:
+        tuple: (list of regression descriptions, list of notes)
+    """
+    regressions, notes = [], []
+    if current['meta']['corpus']['digest'] != baseline['meta']['corpus']['digest']:
+        notes.append("corpus differs from the baseline's, differences may not be regressions")
+
+    def check(name, metric, new, old, higher_is_better):
+        if new is None or old is None or old == 0:
+            return
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        line = f"{name} {metric}: {old:g} -> {new:g} ({change:+.1%})"
+        if worse > tolerance:
+            regressions.append(line)
+        elif worse < -tolerance:
+            notes.append(f"improved: {line}")
+
+    for name, result in current['configs'].items():
+        base = baseline['configs'].get(name)
+        if base is None or 'error' in result or 'error' in base:
+            continue
+        check(name, 'pages_per_sec', result['end_to_end']['pages_per_sec'],
+              base['end_to_end']['pages_per_sec'], True)
+        check(name, 'peak_rss_mb', result['end_to_end']['peak_rss_mb'], base['end_to_end']['peak_rss_mb'], False)
+        for stage, summary in result['stages'].items():
+            old = base['stages'].get(stage)
+            if old and max(summary['p95_ms'], old['p95_ms']) >= 1.0:
+                check(name, f"{stage} p95_ms", summary['p95_ms'], old['p95_ms'], False)
+    return regressions, notes
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR pipeline benchmark suite')
+    parser.add_argument('--configs', nargs='+', choices=list(CONFIGS), default=list(CONFIGS),
+                        help='Engine/mode configurations to run (default: all)')
+    parser.add_argument('--corpus', default=str(ROOT / 'benchmarks' / 'corpus'), help='Corpus directory')
+    parser.add_argument('--scale', type=int, default=1, help='Corpus size multiplier')
+    parser.add_argument('--output', default='benchmark_results.json', help='Results JSON file')
+    parser.add_argument('--baseline', help='Results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative regression (0.10 = 10%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regressions')
+    parser.add_argument('--skip-nlp', action='store_true', help='Skip the embed, classify and extract stages')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_config(args.worker, args.corpus, args.skip_nlp)))
+        return
+
+    corpus = build_corpus(args.corpus, args.scale)
+    print(f"Corpus: {len(corpus['files'])} files, {corpus['pages']} pages (digest {corpus['digest'][:12]})")
+
+    from scheduler import available_cpus
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': available_cpus(),
+            'corpus': {key: corpus[key] for key in ('version', 'scale', 'seed', 'font', 'digest', 'pages')},
+        },
+        'configs': {},
+    }
+    for name in args.configs:
+        results['configs'][name] = run_worker(name, args.corpus, args.skip_nlp)
+        print_result(name, results['configs'][name])
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions, notes = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for note in notes:
+            print(f"  note: {note}")
+        for regression in regressions:
+            print(f"  REGRESSION: {regression}")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
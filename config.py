@@ -46,7 +46,7 @@ LANGUAGE_MAPPING = {
     "fra": "fr", 
     "deu": "de",
     "spa": "es",
-    "chi_sim": "zh",
+    "chi_sim": "ch_sim",
     "ara": "ar",
     "rus": "ru",
     "jpn": "ja",
@@ -5,17 +5,19 @@ FastAPI application for document processing and entity extraction
 import os
 import time
 import tempfile
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 import asyncio
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import uvicorn
+from fastapi.responses import JSONResponse, Response
 
 from main import OCRProcessor
 from vector_db import VectorDatabase
 from entity_extractor import LocalEntityExtractor
+from metrics import render as render_metrics, CONTENT_TYPE, ERRORS, REQUESTS_IN_FLIGHT, REQUEST_SECONDS
+from profiling import RequestProfiler
 
 app = FastAPI(
     title="Document Processing API",
@@ -23,12 +25,87 @@ app = FastAPI(
     version="1.0.0"
 )
 
+def _lazy(factory):
+    """
+    Getter that builds a component on first use
+
+    Importing the app stays fast and loads no models; the first request
+    that needs a component pays for it once, even when requests race.
+    """
+    instance = []
+    lock = threading.Lock()
+    
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+    return get
+
 # Initialize components
-ocr_processor = OCRProcessor(ocr_engine="tesseract")
-vector_db = VectorDatabase("api_vector_db")
-entity_extractor = LocalEntityExtractor()
+# A hung page must not tie up a request worker indefinitely
+get_ocr_processor = _lazy(lambda: OCRProcessor(ocr_engine="tesseract", cache_dir="api_ocr_cache",
+                                               page_timeout=60.0, document_timeout=300.0))
+get_vector_db = _lazy(lambda: VectorDatabase("api_vector_db"))
+get_entity_extractor = _lazy(LocalEntityExtractor)
+
+def track_requests(app: FastAPI, name: str):
+    """
+    Count in-flight requests and time them per route
+    
+    Paths that match no route are grouped as 'other' so unknown URLs
+    can't grow the number of series.
+    """
+    @app.middleware("http")
+    async def metrics_middleware(request, call_next):
+        routes = {route.path for route in app.routes}
+        path = request.url.path if request.url.path in routes else 'other'
+        status = '500'
+        start = time.perf_counter()
+        with REQUESTS_IN_FLIGHT.labels(name, path).track_inprogress():
+            try:
+                response = await call_next(request)
+                status = str(response.status_code)
+                return response
+            finally:
+                REQUEST_SECONDS.labels(name, path, status).observe(time.perf_counter() - start)
+
+def profile_requests(app: FastAPI, profiler: RequestProfiler, paths):
+    """
+    Profile requests to ``paths`` that the profiler picks
+    
+    Nothing is installed when profiling is off, so it costs nothing
+    unless enabled. Profiled responses carry the artifact's request ID
+    in X-Profile-Id.
+    """
+    if not profiler.enabled:
+        return
+    
+    @app.middleware("http")
+    async def profiling_middleware(request, call_next):
+        if request.url.path not in paths or not profiler.should_profile(request.headers):
+            return await call_next(request)
+        
+        request_id = profiler.request_id(request.headers)
+        with profiler.profile(request_id, path=request.url.path) as summary:
+            response = await call_next(request)
+            summary['status'] = response.status_code
+        response.headers['X-Profile-Id'] = request_id
+        return response
+
+async def get_metrics():
+    """Prometheus metrics of this process"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+# Off by default, see profiling.py for the OCR_PROFILE_* settings
+profiler = RequestProfiler.from_env()
+
+track_requests(app, "api")
+profile_requests(app, profiler, {"/extract_entities/"})
+app.add_api_route("/metrics", get_metrics, methods=["GET"])
 
-ALLOWED_EXTENSIONS = {'.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp'}
+ALLOWED_EXTENSIONS = {'.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
 
 @app.post("/extract_entities/")
 async def extract_entities(file: UploadFile = File(...)) -> Dict[str, Any]:
@@ -54,6 +131,7 @@ async def extract_entities(file: UploadFile = File(...)) -> Dict[str, Any]:
         
         try:
             # Process with OCR
+            ocr_processor = get_ocr_processor()
             if file_ext == '.pdf':
                 text, ocr_confidence = ocr_processor.process_pdf(temp_path)
             else:
@@ -66,7 +144,7 @@ async def extract_entities(file: UploadFile = File(...)) -> Dict[str, Any]:
             doc_type, classification_confidence = await classify_document(text)
             
             # Extract entities based on document type
-            entities = await entity_extractor.extract_entities(text, doc_type)
+            entities = await get_entity_extractor().extract_entities(text, doc_type)
             
             processing_time = time.time() - start_time
             
@@ -84,12 +162,14 @@ async def extract_entities(file: UploadFile = File(...)) -> Dict[str, Any]:
     except HTTPException:
         raise
     except Exception as e:
+        ERRORS.labels('api', 'processing_error').inc()
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 async def classify_document(text: str) -> tuple[str, float]:
     """
     Classify document type using vector database similarity search
     """
+    vector_db = get_vector_db()
     try:
         # Search for similar documents
         results = vector_db.search_similar(text, k=1)
@@ -103,6 +183,7 @@ async def classify_document(text: str) -> tuple[str, float]:
             
     except Exception:
         # Fallback to simple keyword-based classification
+        ERRORS.labels('vector_db', 'search_error').inc()
         return vector_db._detect_document_type(text), 0.3
 
 @app.get("/health")
@@ -112,8 +193,11 @@ async def health_check():
 
 @app.get("/stats")
 async def get_stats():
-    """Get vector database statistics"""
-    return vector_db.get_stats()
+    """Get vector database and OCR cache statistics"""
+    stats = get_vector_db().get_stats()
+    stats['ocr_cache'] = get_ocr_processor().get_cache_stats()
+    return stats
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
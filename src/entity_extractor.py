@@ -2,16 +2,15 @@
 Entity extraction using LLM prompts
 """
 
+import importlib.util
 import json
 import re
 from typing import Dict, Any, Optional
 
-try:
-    import openai
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+from metrics import STAGE_SECONDS, ERRORS
+
+# The openai client is only imported when an API key is configured
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
 
 class EntityExtractor:
     """Entity extraction using OpenAI GPT or local models"""
@@ -21,6 +20,7 @@ class EntityExtractor:
         self.use_openai = api_key is not None and OPENAI_AVAILABLE
         
         if self.use_openai:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
         
         # Document type specific field mappings
@@ -51,9 +51,11 @@ class EntityExtractor:
         """Extract entities from text based on document type"""
         
         if self.use_openai:
-            return await self._extract_with_openai(text, document_type)
+            with STAGE_SECONDS.labels('entities', 'openai').time():
+                return await self._extract_with_openai(text, document_type)
         else:
-            return self._extract_with_regex(text, document_type)
+            with STAGE_SECONDS.labels('entities', 'regex').time():
+                return self._extract_with_regex(text, document_type)
     
     async def _extract_with_openai(self, text: str, document_type: str) -> Dict[str, Any]:
         """Extract entities using OpenAI GPT"""
@@ -92,9 +94,11 @@ Document Text:
                 if json_match:
                     return json.loads(json_match.group())
                 else:
+                    ERRORS.labels('entities', 'parse_error').inc()
                     return {"error": "Failed to parse LLM response"}
                     
         except Exception as e:
+            ERRORS.labels('entities', 'api_error').inc()
             return {"error": f"OpenAI API error: {str(e)}"}
     
     def _extract_with_regex(self, text: str, document_type: str) -> Dict[str, Any]:
@@ -156,4 +160,5 @@ class LocalEntityExtractor(EntityExtractor):
         super().__init__(api_key=None)
     
     async def extract_entities(self, text: str, document_type: str) -> Dict[str, Any]:
-        return self._extract_with_regex(text, document_type)
\ No newline at end of file
+        with STAGE_SECONDS.labels('entities', 'regex').time():
+            return self._extract_with_regex(text, document_type)
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Page layout analysis: layout classification, text-block and blank-page detection
+"""
+
+import cv2
+import numpy as np
+
+def to_gray(image):
+    """Grayscale uint8 array from a PIL Image or numpy array"""
+    img_array = np.asarray(image)
+    if img_array.ndim == 3:
+        code = cv2.COLOR_RGBA2GRAY if img_array.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+        return cv2.cvtColor(img_array, code)
+    return img_array
+
+def binarize(gray):
+    """Otsu threshold with ink as foreground (255)"""
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+
+def classify_layout(binary):
+    """
+    Label a page 'text', 'mixed' or 'dense' from its contour statistics
+
+    Args:
+        binary (ndarray): Ink-as-foreground binary image
+    """
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    # Analyze contour properties
+    areas = [area for area in (cv2.contourArea(c) for c in contours) if area > 100]
+    if not areas:
+        return 'text'
+
+    avg_area = np.mean(areas)
+    area_std = np.std(areas)
+
+    # Simple heuristic for layout detection
+    if area_std / avg_area > 2.0:
+        return 'mixed'  # Tables, forms, mixed content
+    elif len(areas) > 50:
+        return 'dense'  # Dense text, newspapers
+    else:
+        return 'text'   # Regular text documents
+
+def _merge_boxes(boxes, gap):
+    """Merge boxes that overlap or lie within ``gap`` pixels of each other"""
+    boxes = [list(box) for box in boxes]
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        while boxes:
+            x, y, w, h = boxes.pop()
+            i = 0
+            while i < len(boxes):
+                bx, by, bw, bh = boxes[i]
+                if (bx - gap <= x + w and x - gap <= bx + bw and
+                        by - gap <= y + h and y - gap <= by + bh):
+                    nx, ny = min(x, bx), min(y, by)
+                    w, h = max(x + w, bx + bw) - nx, max(y + h, by + bh) - ny
+                    x, y = nx, ny
+                    boxes.pop(i)
+                    merged = True
+                else:
+                    i += 1
+            result.append([x, y, w, h])
+        boxes = result
+    return [tuple(box) for box in boxes]
+
+def reading_order(boxes):
+    """
+    Sort boxes top-to-bottom, left-to-right
+
+    Boxes whose vertical centre falls inside the first box of the current
+    row are treated as the same row and ordered by x.
+    """
+    ordered = []
+    remaining = sorted(boxes, key=lambda box: box[1])
+    while remaining:
+        first = remaining[0]
+        row = [box for box in remaining if box[1] + box[3] / 2 < first[1] + first[3]]
+        remaining = [box for box in remaining if box not in row]
+        ordered.extend(sorted(row, key=lambda box: box[0]))
+    return ordered
+
+def find_text_regions(binary, min_area=400, padding=8):
+    """
+    Find text blocks on a page as merged bounding boxes in reading order
+
+    Characters are smeared into lines and paragraphs with a dilation sized
+    relative to the page, so margins and whitespace never produce a region.
+
+    Args:
+        binary (ndarray): Ink-as-foreground binary image
+        min_area (int): Smallest block area kept, filters specks and noise
+        padding (int): Pixels added around every block before cropping
+
+    Returns:
+        list: (x, y, width, height) boxes
+    """
+    height, width = binary.shape[:2]
+    kernel = cv2.getStructuringElement(
+        cv2.MORPH_RECT, (max(15, width // 60), max(3, height // 200))
+    )
+    blocks = cv2.dilate(binary, kernel)
+
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h < min_area:
+            continue
+        x0, y0 = max(0, x - padding), max(0, y - padding)
+        x1, y1 = min(width, x + w + padding), min(height, y + h + padding)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+
+    return reading_order(_merge_boxes(boxes, padding))
+
+def analyze_layout(image, with_regions=False):
+    """
+    Layout label and optional text regions from a single thresholding pass
+
+    Args:
+        image: PIL Image or numpy array
+        with_regions (bool): Also return text-block boxes
+
+    Returns:
+        tuple: (layout label, list of boxes or None)
+    """
+    binary = binarize(to_gray(image))
+    regions = find_text_regions(binary) if with_regions else None
+    return classify_layout(binary), regions
+
+def is_blank_page(image, sensitivity=1.0, margin=0.03):
+    """
+    Detect blank and near-blank pages before OCR
+
+    Separator sheets and empty back sides only carry scanner noise: a tiny
+    fraction of dark pixels and no components big enough to be characters.
+    A page with a single word such as "VOID" or "Page 2" still has a few
+    character-sized components and is OCR'd. Both statistics are computed
+    on the whole array at once; a border strip is ignored so scanner edges
+    and punch holes don't count as content.
+
+    Args:
+        image: PIL Image or numpy array of the page
+        sensitivity (float): Scales both thresholds, higher values treat
+            more pages as blank (0 disables detection); above 1 pages with
+            up to sensitivity - 1 character-sized specks are skipped too
+        margin (float): Fraction of width/height ignored at each edge
+
+    Returns:
+        bool: True if the page can be skipped
+    """
+    if sensitivity <= 0:
+        return False
+
+    gray = to_gray(image)
+    height, width = gray.shape[:2]
+    dy, dx = int(height * margin), int(width * margin)
+    gray = gray[dy:height - dy, dx:width - dx]
+
+    ink = (gray < 160).astype(np.uint8)
+    ink_ratio = ink.mean()
+    if ink_ratio >= 0.002 * sensitivity:
+        return False
+
+    # Components the size of a small character at this resolution; dust and
+    # JPEG speckle stay below it
+    min_area = max(4, int(gray.size * 2e-6))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    components = int(np.count_nonzero(stats[1:, cv2.CC_STAT_AREA] >= min_area))
+    return components < sensitivity
@@ -1,36 +1,168 @@
-import os
+import argparse
 from pathlib import Path
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image, ImageEnhance
 import logging
+import multiprocessing
+import threading
+import queue
+import subprocess
+import json
+import hashlib
+import time
+import functools
+from contextlib import contextmanager
 import cv2
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from tqdm import tqdm
-import easyocr
-from scipy import ndimage
-from skimage import filters, morphology
+from ocr_engines import create_engine, OCREngineError, OCRTimeoutError, ENGINES
+from scheduler import WorkBudget, Deadline, plan_threads, apply_thread_limits, autotune_threads
+from ocr_results import PageResult, DocumentResult
+from pdf_pages import iter_pdf_pages, render_pdf_page, get_page_count, extract_text_layer, find_scanned_pages, is_usable_text
+from memory import PeakMemoryTracker
+from layout import analyze_layout, is_blank_page, to_gray
+from page_image import PageImage, get_frame_count, iter_image_frames
+from ocr_cache import OCRCache, PageHashCache
+from manifest import JobManifest
+from output_sink import create_sink, SINKS
+from metrics import STAGE_SECONDS, PAGES, CACHE_REQUESTS, ERRORS, timed
+
+# Tesseract page segmentation modes to try for each detect_layout label, best
+# guess first. Adaptive mode only moves down the list on low confidence.
+LAYOUT_PSM_ORDER = {
+    'text': [6, 4, 3],     # Uniform block of text
+    'dense': [3, 4, 6],    # Multi-column / newspaper style pages
+    'mixed': [4, 11, 6],   # Tables and forms, fall back to sparse text
+}
 
 class OCRProcessor:
-    def __init__(self, output_dir="output", ocr_engine="tesseract", language='eng'):
+    def __init__(self, output_dir="output", ocr_engine="tesseract", language='eng',
+                 tesseract_mode='adaptive', confidence_threshold=70.0,
+                 page_workers=None, cpu_budget=None, dpi=300, max_pages_in_memory=None,
+                 dpi_mode='fixed', low_dpi=150, escalation_confidence=60.0, min_char_density=2.0,
+                 use_text_layer=True, min_text_layer_chars=50,
+                 cache_dir=None, cache_max_bytes=1024 * 1024 * 1024, page_cache=False,
+                 region_ocr=False, max_regions=30, blank_sensitivity=1.0, easyocr_batch_size=8,
+                 cascade_confidence=60.0, output_format='text', shard_max_records=10000,
+                 page_timeout=120.0, document_timeout=None, reader_memory_mb=1024,
+                 intra_op_threads=None):
         """
         Initialize the OCR processor
         
         Args:
             output_dir (str): Directory to save output text files
-            ocr_engine (str): OCR engine to use ('tesseract' or 'easyocr')
+            ocr_engine (str): OCR engine to use ('tesseract', 'tesseract-api'
+                for in-process Tesseract, 'easyocr', or 'cascade' for Tesseract
+                with EasyOCR re-reading only low-confidence lines)
             language (str): Language for OCR processing
+            tesseract_mode (str): 'adaptive' runs one image_to_data pass with the
+                PSM picked from the page layout and only retries below the
+                confidence threshold; 'exhaustive' tries every PSM on every variant
+            confidence_threshold (float): Average word confidence (0-100) that
+                stops further adaptive attempts
+            page_workers (int): Threads OCRing pages of multi-page documents
+                in parallel (defaults to the CPU budget, 1 disables fan-out)
+            cpu_budget (int): Maximum OCR work units running at once across
+                file and page tasks (defaults to the available CPUs, respecting
+                affinity and cgroup quota, divided by intra_op_threads)
+            dpi (int): Resolution used to rasterize PDF pages
+            dpi_mode (str): 'fixed' renders every page at dpi; 'progressive'
+                OCRs at low_dpi first and re-renders only weak pages at dpi
+            low_dpi (int): First-pass resolution in progressive mode
+            escalation_confidence (float): Progressive pages below this
+                confidence are retried at dpi
+            min_char_density (float): Progressive pages with fewer recognized
+                characters per square inch are retried at dpi
+            max_pages_in_memory (int): Page bitmaps allowed to be rendered and
+                waiting for OCR at once, shared by all documents being
+                processed (defaults to page_workers or the CPU budget,
+                whichever is larger)
+            use_text_layer (bool): Take text from the PDF's embedded text layer
+                for pages that have one instead of running OCR
+            min_text_layer_chars (int): Alphanumeric characters a page's text
+                layer needs before it is trusted
+            cache_dir (str): Directory of the persistent OCR result cache
+                (None disables caching)
+            cache_max_bytes (int): Cache size before least recently used
+                results are evicted
+            page_cache (bool): Also reuse OCR text of pages that are a rescan
+                of an earlier page, verified at full resolution (needs cache_dir)
+            region_ocr (bool): OCR only the text blocks found by layout
+                analysis, in parallel, instead of the whole page
+            max_regions (int): Pages with more blocks than this are OCR'd whole
+            blank_sensitivity (float): How readily near-empty pages are skipped
+                before OCR, higher skips more (0 disables blank detection)
+            easyocr_batch_size (int): Pages and images from concurrent page
+                and file tasks that EasyOCR recognizes in one batch (1 disables batching)
+            cascade_confidence (float): Tesseract line confidence below which
+                the cascade engine asks EasyOCR
+            output_format (str): 'text' writes <name>.txt and <name>_metadata.txt
+                per file; 'jsonl' or 'parquet' append one record per file, with
+                page text, word boxes, settings and timings, to rolling shards
+            shard_max_records (int): Records per JSONL/Parquet shard
+            page_timeout (float): Seconds the engine may spend on one page
+                before it is stopped and the page retried once at half
+                resolution (None disables); unbatched EasyOCR then runs in
+                worker processes that can be killed, each with its own model
+            document_timeout (float): Seconds for a whole document; pages not
+                finished by then are marked failed (None disables)
+            reader_memory_mb (int): EasyOCR model weights kept loaded across
+                all languages before least recently used readers are dropped
+            intra_op_threads (int): Threads a single OCR call may use (OpenMP
+                in Tesseract, torch and OpenCV), defaults to what suits the
+                engine given the CPUs left per work unit; the CLI applies it
+                with scheduler.apply_thread_limits
         """
         self.output_dir = output_dir
         self.ocr_engine = ocr_engine.lower()
         self.language = language
+        self.tesseract_mode = tesseract_mode.lower()
+        self.confidence_threshold = confidence_threshold
+        # Work units x threads per unit stays within the CPUs, see plan_threads
+        slots, self.intra_op_threads = plan_threads(self.ocr_engine, cpu_budget, intra_op_threads)
+        self.budget = WorkBudget(slots)
+        self.page_workers = page_workers or self.budget.slots
+        self.dpi = dpi
+        self.dpi_mode = dpi_mode
+        self.low_dpi = low_dpi
+        self.escalation_confidence = escalation_confidence
+        self.min_char_density = min_char_density
+        self.dpi_stats = {'pages': 0, 'escalated': 0, 'low_confidence': 0, 'low_density': 0}
+        self._dpi_stats_lock = threading.Lock()
+        self.max_pages_in_memory = max_pages_in_memory or max(self.page_workers, self.budget.slots)
+        # One cap for the whole processor, so concurrent documents in a
+        # thread batch don't each hold their own window of bitmaps
+        self._page_memory = threading.BoundedSemaphore(self.max_pages_in_memory)
+        self.use_text_layer = use_text_layer
+        self.min_text_layer_chars = min_text_layer_chars
+        self.region_ocr = region_ocr
+        self.max_regions = max_regions
+        self.blank_sensitivity = blank_sensitivity
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self._deadlines = threading.local()
+        self.output_format = output_format.lower()
+        self.shard_max_records = shard_max_records
+        self.sink = None
+        if self.output_format != 'text':
+            self.sink = create_sink(self.output_format, output_dir, max_records=shard_max_records)
+        self.cache = OCRCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.page_cache = PageHashCache(cache_dir) if cache_dir and page_cache else None
+        self._page_executor = None
+        self._region_executor = None
+        self._page_executor_lock = threading.Lock()
         self._setup_logging()
         self._setup_output_directory()
         
-        if self.ocr_engine == 'easyocr':
-            # Force language to be 'en' for EasyOCR (it uses 'en' not 'eng')
-            self.reader = easyocr.Reader(['en'], gpu=False)
+        self.easyocr_batch_size = easyocr_batch_size
+        self.cascade_confidence = cascade_confidence
+        self.reader_memory_mb = reader_memory_mb
+        max_reader_bytes = reader_memory_mb * 1024 * 1024 if reader_memory_mb else None
+        engine_options = {
+            'easyocr': {'batch_size': easyocr_batch_size, 'max_reader_bytes': max_reader_bytes},
+            'cascade': {'cutoff': cascade_confidence, 'max_reader_bytes': max_reader_bytes},
+        }.get(self.ocr_engine, {})
+        self.engine = create_engine(self.ocr_engine, self.language, **engine_options)
+        self.engine.set_budget(self.budget)
 
     def _setup_logging(self):
         """Configure logging"""
@@ -46,68 +178,184 @@ class OCRProcessor:
 
     def detect_layout(self, image):
         """Detect document layout type"""
-        img_array = np.array(image)
-        if len(img_array.shape) == 3:
-            img = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            img = img_array
-        contours, _ = cv2.findContours(cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Analyze contour properties
-        areas = [cv2.contourArea(c) for c in contours if cv2.contourArea(c) > 100]
-        if not areas:
-            return 'text'
-        
-        avg_area = np.mean(areas)
-        area_std = np.std(areas)
-        
-        # Simple heuristic for layout detection
-        if area_std / avg_area > 2.0:
-            return 'mixed'  # Tables, forms, mixed content
-        elif len(areas) > 50:
-            return 'dense'  # Dense text, newspapers
-        else:
-            return 'text'   # Regular text documents
+        return analyze_layout(image)[0]
+
+    @contextmanager
+    def _deadline_scope(self, deadline):
+        """Hold engine calls made on this thread to a deadline"""
+        previous = getattr(self._deadlines, 'current', None)
+        self._deadlines.current = deadline
+        try:
+            yield deadline
+        finally:
+            self._deadlines.current = previous
+
+    def _timeout(self):
+        """
+        Time the next engine call on this thread is allowed
+        
+        Returns:
+            float: Seconds left on the current deadline, None without one
+        
+        Raises:
+            OCRTimeoutError: The deadline has already passed
+        """
+        deadline = getattr(self._deadlines, 'current', None)
+        if deadline is None or deadline.expires is None:
+            return None
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise OCRTimeoutError("Deadline passed before the engine call")
+        return remaining
 
     def preprocess_image(self, image, layout_type='text'):
-        """Simplified preprocessing for better OCR results"""
-        img_array = np.array(image)
-        
-        # Handle different image formats
-        if len(img_array.shape) == 3:
-            # Color image
-            if img_array.shape[2] == 4:  # RGBA
-                img = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
-            else:  # RGB
-                img = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        else:
-            # Already grayscale
-            gray = img_array
+        """
+        Simplified preprocessing for better OCR results
+        
+        Page pipelines get this fused into PageImage.enhance; this entry
+        point remains for callers holding a PIL Image or array.
         
+        Returns:
+            ndarray: Contrast-enhanced grayscale array
+        """
         # Simple preprocessing - just enhance contrast
-        gray = cv2.convertScaleAbs(gray, alpha=1.2, beta=10)
+        return cv2.convertScaleAbs(to_gray(image), alpha=1.2, beta=10)
+
+    def _text_from_tesseract_data(self, data):
+        """
+        Rebuild text and average confidence from image_to_data output
+        
+        Words are grouped back into their Tesseract lines so the layout of
+        the page survives in the returned text.
+        
+        Args:
+            data (dict): pytesseract.Output.DICT result
+        
+        Returns:
+            tuple: (extracted text, average word confidence)
+        """
+        lines, confidence_scores = {}, []
+        
+        for i, word in enumerate(data['text']):
+            conf = float(data['conf'][i])
+            if conf > 10 and word.strip():
+                key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                lines.setdefault(key, []).append(word.strip())
+                confidence_scores.append(conf)
+        
+        text = '\n'.join(' '.join(words) for words in lines.values())
+        avg_conf = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+        return text, avg_conf
+
+    def _words_from_tesseract_data(self, data):
+        """
+        Word boxes and confidences from image_to_data output
+        
+        Returns:
+            list: {'text', 'confidence', 'box': [x, y, width, height]} per word
+        """
+        return [
+            {
+                'text': word.strip(),
+                'confidence': float(data['conf'][i]),
+                'box': [data['left'][i], data['top'][i], data['width'][i], data['height'][i]]
+            }
+            for i, word in enumerate(data['text'])
+            if float(data['conf'][i]) > 10 and word.strip()
+        ]
+
+    def _tesseract_adaptive(self, images, layout_type='text'):
+        """
+        Single-pass Tesseract OCR that only escalates on low confidence
+        
+        Text and confidence come from one image_to_data call per attempt. The
+        layout's preferred PSM is tried on each image variant first, then the
+        fallback PSMs on the best variant, stopping as soon as the average
+        confidence reaches ``confidence_threshold``. The attempts run on the
+        engine's search_engine and only the winner goes through its refine
+        pass, so the cascade consults EasyOCR once per page.
+        
+        Args:
+            images (list): Image variants, most promising first
+            layout_type (str): Layout label from detect_layout
+        
+        Returns:
+            tuple: (extracted text, confidence score, word boxes)
+        """
+        psm_order = LAYOUT_PSM_ORDER.get(layout_type, LAYOUT_PSM_ORDER['text'])
+        attempts = [(image, psm_order[0]) for image in images]
+        attempts += [(None, psm) for psm in psm_order[1:]]
+        
+        best_text, best_conf, best_image, best_data = "", 0.0, images[0], None
+        search_engine = self.engine.search_engine
+        
+        for image, psm in attempts:
+            image = best_image if image is None else image
+            try:
+                data = search_engine.image_to_data(image, psm=psm, timeout=self._timeout())
+            except OCRTimeoutError:
+                # Out of time: settle for an earlier attempt if there is one
+                if best_data is None:
+                    raise
+                self.logger.warning(f"Tesseract timed out with --psm {psm}, keeping the best earlier attempt")
+                break
+            except OCREngineError as e:
+                self.logger.warning(f"Tesseract failed with --psm {psm}: {e}")
+                continue
+            
+            text, confidence = self._text_from_tesseract_data(data)
+            if text and confidence > best_conf:
+                best_text, best_conf, best_image, best_data = text, confidence, image, data
+            
+            if best_conf >= self.confidence_threshold:
+                break
         
-        return Image.fromarray(gray)
+        if best_data is not None and search_engine is not self.engine:
+            try:
+                data = self.engine.refine(best_image, best_data, timeout=self._timeout())
+            except OCREngineError as e:
+                # Includes running out of time, the search result stands
+                self.logger.warning(f"{self.ocr_engine} refinement failed, keeping Tesseract's words: {e}")
+            else:
+                text, confidence = self._text_from_tesseract_data(data)
+                if text:
+                    best_text, best_conf, best_data = text, confidence, data
+        
+        words = self._words_from_tesseract_data(best_data) if best_data else []
+        return best_text, best_conf, words
 
     def process_with_tesseract(self, image, layout_type='text'):
         """Simplified Tesseract processing for better text extraction"""
+        return self._tesseract(image, layout_type)[:2]
+
+    def _tesseract(self, image, layout_type='text'):
+        """
+        Tesseract OCR in the configured mode
+        
+        Returns:
+            tuple: (extracted text, confidence score, word boxes)
+        """
+        if self.tesseract_mode == 'adaptive':
+            return self._tesseract_adaptive([image], layout_type)
+        
         # Try multiple PSM modes
-        psm_modes = ['--psm 6', '--psm 8', '--psm 4', '--psm 3']
+        psm_modes = [6, 8, 4, 3]
         results = []
         
         for psm in psm_modes:
             try:
                 # Simple approach without character whitelist
-                text = pytesseract.image_to_string(image, config=psm)
+                text = self.engine.search_engine.image_to_string(image, psm=psm, timeout=self._timeout())
                 if text.strip():
                     results.append(text.strip())
-            except:
+            except OCRTimeoutError:
+                raise
+            except OCREngineError:
                 continue
         
         # Try with data extraction for confidence
         try:
-            data = pytesseract.image_to_data(image, config='--psm 6', output_type=pytesseract.Output.DICT)
+            data = self.engine.image_to_data(image, psm=6, timeout=self._timeout())
             text_parts, confidence_scores = [], []
             
             for i, conf in enumerate(data['conf']):
@@ -119,36 +367,51 @@ class OCRProcessor:
                 text = ' '.join(text_parts)
                 avg_conf = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 50.0
                 results.append(text.strip())
-                return text.strip(), avg_conf
-        except:
+                return text.strip(), avg_conf, self._words_from_tesseract_data(data)
+        except OCRTimeoutError:
+            raise
+        except OCREngineError:
             pass
         
         # Return best result by length
         if results:
             best_text = max(results, key=len)
-            return best_text, 60.0
-        return "", 0.0
+            return best_text, 60.0, []
+        return "", 0.0, []
 
     def process_with_easyocr(self, image):
         """
         Process image using EasyOCR
         
         Args:
-            image: PIL Image object
+            image: PIL Image or numpy array
         
         Returns:
             tuple: (extracted text, confidence score)
         """
-        # Convert PIL image to OpenCV format
-        img_array = np.array(image)
-        if len(img_array.shape) == 3:
-            img = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-        else:
-            img = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
-        
         # Get results from EasyOCR
-        results = self.reader.readtext(img)
-        
+        return self._text_from_easyocr(self.engine.readtext(image, timeout=self._timeout()))
+
+    def _easyocr(self, image):
+        """EasyOCR text, confidence and word boxes"""
+        detections = self.engine.readtext(image, timeout=self._timeout())
+        return (*self._text_from_easyocr(detections), self._words_from_easyocr(detections))
+
+    def _words_from_easyocr(self, detections):
+        """Word boxes from EasyOCR detections, confidence scaled to 0-100 like Tesseract"""
+        words = []
+        for box, text, confidence in detections:
+            xs = [int(point[0]) for point in box]
+            ys = [int(point[1]) for point in box]
+            words.append({
+                'text': text,
+                'confidence': float(confidence) * 100,
+                'box': [min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)]
+            })
+        return words
+
+    def _text_from_easyocr(self, results):
+        """Join EasyOCR detections into text and average confidence"""
         text_parts = []
         confidence_scores = []
         
@@ -161,143 +424,975 @@ class OCRProcessor:
         
         return text.strip(), avg_confidence
 
+    def _ocr_image_file(self, image_path):
+        """
+        OCR a single image file with adaptive preprocessing
+        
+        Returns:
+            tuple: (extracted text, confidence score, word boxes)
+        """
+        # Hold a budget slot only while the CPU-heavy work runs
+        with self.budget.slot():
+            # Decoded once into a single grayscale buffer
+            with STAGE_SECONDS.labels('ocr', 'render').time():
+                page = PageImage.open(image_path)
+            
+            # Enhance image quality (only for color images), fused with preprocessing
+            with STAGE_SECONDS.labels('ocr', 'preprocess').time():
+                if page.source_mode == 'L':
+                    image, processed_image = page.enhance(contrast=1.0)
+                else:
+                    image, processed_image = page.enhance(contrast=1.2, sharpness=1.1)
+            del page
+            
+            # Detect layout type
+            with STAGE_SECONDS.labels('ocr', 'layout').time():
+                layout_type, regions = analyze_layout(image, with_regions=self.region_ocr)
+            
+            use_regions = self.use_regions(regions)
+            if not use_regions and not self.engine.batched:
+                with STAGE_SECONDS.labels('ocr', 'recognize').time():
+                    return self._ocr_variants(image, processed_image, layout_type)
+        
+        # Region crops take their own budget slots, batched EasyOCR the batcher's
+        with STAGE_SECONDS.labels('ocr', 'recognize').time():
+            if use_regions:
+                return self.ocr_regions(processed_image, regions)
+            return self._ocr_variants(image, processed_image, layout_type)
+
+    def _ocr_variants(self, image, processed_image, layout_type):
+        """
+        OCR an image, trying both the original and preprocessed variants
+        
+        Returns:
+            tuple: (extracted text, confidence score, word boxes)
+        """
+        # Adaptive mode tries the processed image first and only falls
+        # back to the original when confidence is low
+        if self.engine.family == 'tesseract' and self.tesseract_mode == 'adaptive':
+            return self._tesseract_adaptive([processed_image, image], layout_type)
+        
+        # Try both original and processed images
+        results = []
+        
+        # Try original image first
+        if self.engine.family == 'tesseract':
+            result1 = self._tesseract(image, layout_type)
+            if result1[0]:
+                results.append(result1)
+            
+            # Try processed image
+            result2 = self._tesseract(processed_image, layout_type)
+            if result2[0]:
+                results.append(result2)
+        else:
+            # Both variants are submitted together so they share one batch
+            for detections in self.engine.readtext_batch([image, processed_image], timeout=self._timeout()):
+                text, conf = self._text_from_easyocr(detections)
+                if text:
+                    results.append((text, conf, self._words_from_easyocr(detections)))
+        
+        # Return best result
+        if results:
+            return max(results, key=lambda x: len(x[0]))
+        return "", 0.0, []
+
+    def use_regions(self, regions):
+        """
+        Whether region OCR should be used for a page
+        
+        Pages with more blocks than ``max_regions`` are dense enough that one
+        full-page pass is cheaper than many small ones.
+        """
+        return self.region_ocr and regions is not None and len(regions) <= self.max_regions
+
+    def _get_region_executor(self):
+        """Thread pool for text-block crops, separate from page tasks so they never wait on each other"""
+        with self._page_executor_lock:
+            if self._region_executor is None:
+                self._region_executor = ThreadPoolExecutor(
+                    max_workers=self.page_workers, thread_name_prefix='ocr-region'
+                )
+            return self._region_executor
+
+    def _ocr_region(self, crop, deadline=None):
+        """OCR one text-block crop while holding a budget slot"""
+        # Region threads are held to the deadline of the page they belong to
+        with self._deadline_scope(deadline):
+            if self.engine.batched:
+                return self._easyocr(crop)
+            with self.budget.slot():
+                if self.engine.family == 'tesseract':
+                    return self._tesseract(crop, 'text')
+                return self._easyocr(crop)
+
+    def ocr_regions(self, image, regions):
+        """
+        OCR only the text blocks of a page and reassemble them in reading order
+        
+        Args:
+            image (ndarray): Preprocessed grayscale page
+            regions (list): (x, y, width, height) boxes in reading order
+        
+        Returns:
+            tuple: (extracted text, confidence weighted by characters per block,
+                word boxes in page coordinates)
+        """
+        if not regions:
+            return "", 0.0, []
+        
+        # Views into the page buffer, nothing is copied
+        crops = [image[y:y + h, x:x + w] for x, y, w, h in regions]
+        deadline = getattr(self._deadlines, 'current', None)
+        if self.page_workers > 1 and len(crops) > 1:
+            results = list(self._get_region_executor().map(
+                lambda crop: self._ocr_region(crop, deadline), crops
+            ))
+        else:
+            results = [self._ocr_region(crop, deadline) for crop in crops]
+        
+        words = []
+        for (x, y, _, _), (_, _, region_words) in zip(regions, results):
+            for word in region_words:
+                bx, by, bw, bh = word['box']
+                words.append({**word, 'box': [bx + x, by + y, bw, bh]})
+        
+        results = [(text, conf) for text, conf, _ in results if text.strip()]
+        if not results:
+            return "", 0.0, []
+        
+        text = '\n'.join(text for text, _ in results)
+        total_chars = sum(len(text) for text, _ in results)
+        confidence = sum(conf * len(text) for text, conf in results) / total_chars
+        return text, confidence, words
+
+    def extract_image(self, image_path):
+        """
+        OCR an image file into a DocumentResult
+        
+        Multi-page TIFFs are handed to extract_frames.
+        
+        Args:
+            image_path (str): Path to the image
+        
+        Returns:
+            DocumentResult: Extracted text and metadata
+        """
+        try:
+            multi_frame = Path(image_path).suffix.lower() in ('.tif', '.tiff') and get_frame_count(image_path) > 1
+        except OSError as e:
+            self.logger.error(f"Error processing image {image_path}: {str(e)}")
+            return DocumentResult(metadata={'error': str(e)})
+        if multi_frame:
+            return self.extract_frames(image_path)
+        
+        start = time.perf_counter()
+        deadline = Deadline(self.document_timeout)
+        try:
+            with self._deadline_scope(Deadline(self.page_timeout, parent=deadline)):
+                text, confidence, words = self._ocr_image_file(image_path)
+        except OCRTimeoutError as e:
+            try:
+                page = self._page_fallback(1, PageImage.open(image_path), deadline, e, start)
+            except Exception as e:
+                self.logger.error(f"Error processing image {image_path}: {str(e)}")
+                return DocumentResult(metadata={'error': str(e)})
+            result = DocumentResult(page.text, page.confidence, pages=[page])
+            self._note_page_failures(result)
+            return result
+        except Exception as e:
+            self.logger.error(f"Error processing image {image_path}: {str(e)}")
+            return DocumentResult(metadata={'error': str(e)})
+        
+        page = PageResult(1, text, confidence, words=words, seconds=time.perf_counter() - start)
+        return DocumentResult(text, confidence, pages=[page])
+
+    def extract_frames(self, image_path):
+        """
+        OCR a multi-page TIFF frame by frame with bounded memory
+        
+        Frames are decoded lazily and streamed through the same page tasks
+        as PDF pages, so they are OCR'd in parallel, at most
+        ``max_pages_in_memory`` are decoded at once, and each gets its own
+        page result.
+        
+        Args:
+            image_path (str): Path to the TIFF
+        
+        Returns:
+            DocumentResult: Joined text, per-page results and metadata
+        """
+        memory = PeakMemoryTracker()
+        deadline = Deadline(self.document_timeout)
+        try:
+            page_count = get_frame_count(image_path)
+            page_task = functools.partial(self._ocr_page, deadline=deadline)
+            frames = timed(iter_image_frames(image_path), STAGE_SECONDS.labels('ocr', 'render'))
+            pages = self._until(deadline, frames)
+            page_results = self.run_page_stream(page_task, pages, memory)
+            
+            # Frames never decoded because the document ran out of time
+            done = {page.page_number for page in page_results}
+            page_results += [
+                self._failed_page(n, 'document_timeout', 'render',
+                                  "Document deadline passed before the page was decoded", None)
+                for n in range(1, page_count + 1) if n not in done
+            ]
+        except Exception as e:
+            self.logger.error(f"Error processing image {image_path}: {str(e)}")
+            return DocumentResult(metadata={'error': str(e)})
+        
+        result = DocumentResult.from_pages(page_results)
+        result.metadata['pages'] = len(page_results)
+        result.metadata['ocr_pages'] = [p.page_number for p in result.pages if p.source == 'ocr']
+        result.metadata['page_cache_pages'] = [p.page_number for p in result.pages if p.source == 'page_cache']
+        result.metadata['blank_pages'] = [p.page_number for p in result.pages if p.source == 'blank']
+        self._note_page_failures(result)
+        result.metadata['peak_rss_mb'] = memory.peak_mb
+        return result
+
     def process_image(self, image_path):
         """Process image with adaptive preprocessing"""
+        result = self.extract_cached(image_path, self.extract_image)
+        return result.text, result.confidence
+
+    def _ocr_page(self, page_number, image, cache_lookup=True, cache_store=True, deadline=None):
+        """
+        OCR one rasterized page while holding a budget slot
+        
+        Engine calls are held to ``page_timeout``, capped by the document's
+        deadline. A page that runs out of time is retried once at half
+        resolution, see _page_fallback.
+        
+        Args:
+            page_number (int): Page number starting at 1
+            image (PageImage): Rasterized page
+            cache_lookup (bool): Reuse text of a cached scan of the same page
+            cache_store (bool): Add the OCR result to the page cache
+            deadline (Deadline): Deadline of the whole document
+        
+        Returns:
+            PageResult: Text, confidence and word boxes for the page
+        """
+        start = time.perf_counter()
+        if deadline is not None and deadline.expired():
+            return self._failed_page(page_number, 'document_timeout', 'queued',
+                                     "Document deadline passed before the page was OCR'd", start)
         try:
-            image = Image.open(image_path)
+            with self._deadline_scope(Deadline(self.page_timeout, parent=deadline)):
+                return self._ocr_page_once(page_number, image, cache_lookup, cache_store, start)
+        except OCRTimeoutError as e:
+            return self._page_fallback(page_number, image, deadline, e, start)
+
+    def _ocr_page_once(self, page_number, image, cache_lookup, cache_store, start):
+        """Full-quality OCR of one page, see _ocr_page"""
+        words = []
+        with self.budget.slot():
+            gray = image.gray
             
-            # Convert to RGB if needed
-            if image.mode not in ('RGB', 'L'):
-                image = image.convert('RGB')
+            # Separator sheets and empty back sides never reach the OCR engine
+            with STAGE_SECONDS.labels('ocr', 'blank_check').time():
+                blank = is_blank_page(gray, self.blank_sensitivity)
+            if blank:
+                return PageResult(page_number, source='blank')
             
-            # Enhance image quality (only for color images)
-            if image.mode == 'RGB':
-                enhancer = ImageEnhance.Contrast(image)
-                image = enhancer.enhance(1.2)
-                enhancer = ImageEnhance.Sharpness(image)
-                image = enhancer.enhance(1.1)
+            # Recurring boilerplate pages reuse the text of an earlier scan of the page
+            fingerprint = None
+            if self.page_cache is not None and cache_lookup:
+                cached, fingerprint = self.page_cache.get(gray, self._settings_key)
+                CACHE_REQUESTS.labels('page', 'miss' if cached is None else 'hit').inc()
+                if cached is not None:
+                    text, confidence = cached
+                    return PageResult(page_number, text, confidence, source='page_cache')
+            elif self.page_cache is not None and cache_store:
+                # Fingerprint the raw page, lookups never see the enhanced one
+                fingerprint = self.page_cache.fingerprint(gray)
             
-            # Detect layout type
-            layout_type = self.detect_layout(image)
+            # Enhance image quality, fused with preprocessing
+            with STAGE_SECONDS.labels('ocr', 'preprocess').time():
+                enhanced, processed_image = image.enhance(contrast=1.2)
             
-            # Preprocess based on layout
-            processed_image = self.preprocess_image(image, layout_type)
+            # Detect layout for each page
+            with STAGE_SECONDS.labels('ocr', 'layout').time():
+                layout_type, regions = analyze_layout(enhanced, with_regions=self.region_ocr)
+            del enhanced
             
-            # Try both original and processed images
-            results = []
+            use_regions = self.use_regions(regions)
+            recognize_start = time.perf_counter()
+            if not use_regions and self.engine.family == 'tesseract':
+                text, confidence, words = self._tesseract(processed_image, layout_type)
+            elif not use_regions and not self.engine.batched:
+                text, confidence, words = self._easyocr(processed_image)
+        
+        # Region crops take their own budget slots, batched EasyOCR the batcher's
+        if use_regions:
+            text, confidence, words = self.ocr_regions(processed_image, regions)
+        elif self.engine.family == 'easyocr' and self.engine.batched:
+            text, confidence, words = self._easyocr(processed_image)
+        STAGE_SECONDS.labels('ocr', 'recognize').observe(time.perf_counter() - recognize_start)
+        
+        if fingerprint is not None and cache_store and text.strip():
+            self.page_cache.put(fingerprint, self._settings_key, text, confidence)
+        
+        return PageResult(page_number, text, confidence, words=words,
+                          seconds=time.perf_counter() - start)
+
+    def _page_fallback(self, page_number, image, deadline, error, start):
+        """
+        Cheaper second attempt for a page that ran out of time
+        
+        The page is downscaled to half resolution and read in a single engine
+        pass under a fresh page timeout. Pages that time out again, or whose
+        document deadline has passed, come back failed with the reason.
+        
+        Args:
+            page_number (int): Page number starting at 1
+            image (PageImage): Page that timed out
+            deadline (Deadline): Deadline of the whole document
+            error (OCRTimeoutError): Timeout of the first attempt
+            start (float): perf_counter() when the page was started
+        
+        Returns:
+            PageResult: Fallback text, or a failed page with a structured reason
+        """
+        if deadline is not None and deadline.expired():
+            return self._failed_page(page_number, 'document_timeout', 'ocr', error, start)
+        
+        self.logger.warning(f"Page {page_number} timed out after {time.perf_counter() - start:.1f}s "
+                            f"({error}), retrying at half resolution")
+        try:
+            with self._deadline_scope(Deadline(self.page_timeout, parent=deadline)), \
+                    STAGE_SECONDS.labels('ocr', 'fallback').time():
+                text, confidence, words = self._ocr_downscaled(image.gray)
+        except OCRTimeoutError as e:
+            reason = 'document_timeout' if deadline is not None and deadline.expired() else 'page_timeout'
+            return self._failed_page(page_number, reason, 'fallback', e, start)
+        except OCREngineError as e:
+            return self._failed_page(page_number, 'engine_error', 'fallback', e, start)
+        
+        return PageResult(page_number, text, confidence, words=words, fallback='downscaled',
+                          seconds=time.perf_counter() - start)
+
+    def _ocr_downscaled(self, gray):
+        """
+        One engine pass over a page at half resolution
+        
+        Returns:
+            tuple: (extracted text, confidence score, word boxes in full-size coordinates)
+        """
+        small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        if self.engine.family == 'tesseract':
+            with self.budget.slot():
+                data = self.engine.image_to_data(small, psm=6, timeout=self._timeout())
+            text, confidence = self._text_from_tesseract_data(data)
+            words = self._words_from_tesseract_data(data)
+        elif self.engine.batched:
+            text, confidence, words = self._easyocr(small)
+        else:
+            with self.budget.slot():
+                text, confidence, words = self._easyocr(small)
+        
+        words = [{**word, 'box': [value * 2 for value in word['box']]} for word in words]
+        return text, confidence, words
+
+    def _failed_page(self, page_number, reason, stage, error, start):
+        """
+        Result for a page that was given up on
+        
+        Args:
+            reason (str): 'page_timeout', 'document_timeout' or 'engine_error'
+            stage (str): Where it happened: 'queued', 'render', 'ocr' or 'fallback'
+            error: Exception or message with the details
+            start (float): perf_counter() when the page was started, None if never
+        """
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        self.logger.error(f"Page {page_number} failed ({reason} during {stage}): {error}")
+        ERRORS.labels('ocr', reason).inc()
+        return PageResult(page_number, source='failed', seconds=elapsed, failure={
+            'reason': reason, 'stage': stage, 'elapsed': round(elapsed, 3), 'detail': str(error)
+        })
+
+    @staticmethod
+    def _note_page_failures(result):
+        """Summarize failed and fallback pages in the document metadata"""
+        failed = [page for page in result.pages if page.source == 'failed']
+        result.metadata['failed_pages'] = [page.page_number for page in failed]
+        result.metadata['fallback_pages'] = [page.page_number for page in result.pages if page.fallback]
+        if failed:
+            result.metadata['failures'] = [{'page': page.page_number, **page.failure} for page in failed]
+
+    @staticmethod
+    def _until(deadline, pages):
+        """Stop pulling pages from a stream, and so rendering them, once the deadline has passed"""
+        pages = iter(pages)
+        while not deadline.expired():
+            try:
+                page = next(pages)
+            except StopIteration:
+                return
+            yield page
+
+    def _get_page_executor(self):
+        """Thread pool that runs page tasks, shared by every document"""
+        with self._page_executor_lock:
+            if self._page_executor is None:
+                self._page_executor = ThreadPoolExecutor(
+                    max_workers=self.page_workers, thread_name_prefix='ocr-page'
+                )
+            return self._page_executor
+
+    def run_page_stream(self, page_task, pages, memory=None):
+        """
+        Run a page task over a stream of pages in parallel
+        
+        Pages are pulled from the iterator only while fewer than
+        ``max_pages_in_memory`` pages of all documents are waiting or being
+        OCR'd, so rendering never runs far ahead of recognition and each
+        bitmap is released as soon as its page is done.
+        
+        Args:
+            page_task (callable): Called as page_task(page_number, image)
+            pages (iterable): (page_number, image) pairs
+            memory (PeakMemoryTracker): Sampled as pages are rendered and finished
+        
+        Returns:
+            list: Page task results in page order
+        """
+        results = {}
+        pages = iter(pages)
+        executor = self._get_page_executor() if self.page_workers > 1 else None
+        in_flight = deque()
+        
+        while True:
+            # A slot is taken before the page is rendered and given back
+            # once its task is done
+            self._page_memory.acquire()
+            try:
+                page_number, image = next(pages)
+            except StopIteration:
+                self._page_memory.release()
+                break
+            except BaseException:
+                self._page_memory.release()
+                raise
+            if memory:
+                memory.sample()
             
-            # Try original image first
-            if self.ocr_engine == 'tesseract':
-                text1, conf1 = self.process_with_tesseract(image, layout_type)
-                if text1:
-                    results.append((text1, conf1))
-                
-                # Try processed image
-                text2, conf2 = self.process_with_tesseract(processed_image, layout_type)
-                if text2:
-                    results.append((text2, conf2))
-            else:
-                text1, conf1 = self.process_with_easyocr(image)
-                if text1:
-                    results.append((text1, conf1))
-                
-                text2, conf2 = self.process_with_easyocr(processed_image)
-                if text2:
-                    results.append((text2, conf2))
+            if executor is None:
+                try:
+                    results[page_number] = page_task(page_number, image)
+                finally:
+                    self._page_memory.release()
+                continue
             
-            # Return best result
-            if results:
-                return max(results, key=lambda x: len(x[0]))
-            return "", 0.0
-                
-        except Exception as e:
-            self.logger.error(f"Error processing image {image_path}: {str(e)}")
-            return "", 0.0
+            future = executor.submit(page_task, page_number, image)
+            future.add_done_callback(lambda _: self._page_memory.release())
+            in_flight.append((page_number, future))
+            del image
+        
+        while in_flight:
+            done_number, future = in_flight.popleft()
+            results[done_number] = future.result()
+        if memory:
+            memory.sample()
+        
+        return [results[n] for n in sorted(results)]
 
-    def process_pdf(self, pdf_path):
-        """Process PDF with high-quality conversion and adaptive processing"""
+    def _text_layer_pages(self, pdf_path):
+        """
+        Collect pages whose embedded text layer makes OCR unnecessary
+        
+        Pages with large embedded images are left for OCR even if they carry
+        some text, since that is usually a scan with a header or stamp.
+        
+        Returns:
+            dict: Page number -> native text
+        """
         try:
-            # Convert PDF to high-quality images
-            images = convert_from_path(pdf_path, dpi=300, fmt='png')
-            text_content, confidence_scores = [], []
-
-            for i, image in enumerate(images):
-                # Enhance image quality
-                enhancer = ImageEnhance.Contrast(image)
-                image = enhancer.enhance(1.2)
-                
-                # Detect layout for each page
-                layout_type = self.detect_layout(image)
-                processed_image = self.preprocess_image(image, layout_type)
-                
-                if self.ocr_engine == 'tesseract':
-                    text, confidence = self.process_with_tesseract(processed_image, layout_type)
-                else:
-                    text, confidence = self.process_with_easyocr(processed_image)
-                
-                if text.strip():  # Only add non-empty pages
-                    text_content.append(f"--- Page {i+1} ---\n{text}")
-                    confidence_scores.append(confidence)
-
-            full_text = "\n\n".join(text_content)
-            avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+            text_layer = extract_text_layer(pdf_path)
+            scanned_pages = find_scanned_pages(pdf_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.logger.warning(f"Text layer check failed for {pdf_path}, using OCR: {e}")
+            return {}
+        
+        return {
+            page_number: text.strip()
+            for page_number, text in enumerate(text_layer, start=1)
+            if page_number not in scanned_pages and is_usable_text(text, self.min_text_layer_chars)
+        }
+
+    def _escalation_reason(self, page_result, image, dpi):
+        """
+        Decide whether a low-resolution page result needs a high-DPI retry
+        
+        Returns:
+            str: 'low_confidence' or 'low_density', or None to keep the result
+        """
+        if page_result.source != 'ocr' or page_result.fallback:
+            return None
+        if page_result.confidence < self.escalation_confidence:
+            return 'low_confidence'
+        
+        width, height = image.size
+        area_sq_in = (width / dpi) * (height / dpi)
+        chars = sum(1 for c in page_result.text if not c.isspace())
+        if chars / area_sq_in < self.min_char_density:
+            return 'low_density'
+        return None
+
+    def _progressive_page_task(self, pdf_path, deadline=None):
+        """
+        Page task that OCRs at low_dpi and re-renders weak pages at dpi
+        
+        Args:
+            pdf_path (str): PDF the pages come from
+            deadline (Deadline): Deadline of the whole document
+        """
+        def task(page_number, image):
+            # Weak low-resolution text must not end up in the page cache
+            result = self._ocr_page(page_number, image, cache_store=False, deadline=deadline)
+            result.dpi = self.low_dpi
+            reason = self._escalation_reason(result, image, self.low_dpi)
+            if reason and deadline is not None and deadline.expired():
+                # No time left to re-render, keep the low-resolution text
+                reason = None
             
-            return full_text, avg_confidence
+            if reason:
+                del image
+                with self.budget.slot(), STAGE_SECONDS.labels('ocr', 'render').time():
+                    high_res = render_pdf_page(pdf_path, page_number, dpi=self.dpi)
+                high_result = self._ocr_page(page_number, high_res, cache_lookup=False, deadline=deadline)
+                if high_result.source == 'ocr' and high_result.text.strip():
+                    result = high_result
+                    result.dpi = self.dpi
+            elif (self.page_cache is not None and result.source == 'ocr' and not result.fallback
+                  and result.text.strip()):
+                self.page_cache.put(self.page_cache.fingerprint(image.gray), self._settings_key,
+                                    result.text, result.confidence)
             
+            with self._dpi_stats_lock:
+                self.dpi_stats['pages'] += 1
+                if reason:
+                    self.dpi_stats['escalated'] += 1
+                    self.dpi_stats[reason] += 1
+            return result
+        return task
+
+    def get_dpi_stats(self):
+        """Counts of progressive-DPI pages and why they were escalated"""
+        with self._dpi_stats_lock:
+            stats = dict(self.dpi_stats)
+        stats['escalation_rate'] = stats['escalated'] / stats['pages'] if stats['pages'] else 0.0
+        return stats
+
+    def _take_dpi_stats(self):
+        """Counts collected since the last call, handed from pool workers to the parent"""
+        with self._dpi_stats_lock:
+            stats = self.dpi_stats
+            self.dpi_stats = dict.fromkeys(stats, 0)
+        return stats
+
+    def _add_dpi_stats(self, stats):
+        """Merge counts taken from a pool worker"""
+        with self._dpi_stats_lock:
+            for name, value in stats.items():
+                self.dpi_stats[name] += value
+
+    def extract_pdf(self, pdf_path):
+        """
+        OCR a PDF page by page with bounded memory
+        
+        Args:
+            pdf_path (str): Path to the PDF
+        
+        Returns:
+            DocumentResult: Joined text, per-page results and metadata
+        """
+        memory = PeakMemoryTracker()
+        deadline = Deadline(self.document_timeout)
+        try:
+            # Born-digital pages skip rasterization and OCR entirely
+            native_pages = self._text_layer_pages(pdf_path) if self.use_text_layer else {}
+            page_results = [
+                PageResult(page_number, text, 100.0, source='text_layer')
+                for page_number, text in native_pages.items()
+            ]
+            
+            ocr_page_numbers = [
+                n for n in range(1, get_page_count(pdf_path) + 1) if n not in native_pages
+            ]
+            if self.dpi_mode == 'progressive':
+                pages = iter_pdf_pages(pdf_path, dpi=self.low_dpi, page_numbers=ocr_page_numbers)
+                page_task = self._progressive_page_task(pdf_path, deadline)
+            else:
+                pages = iter_pdf_pages(pdf_path, dpi=self.dpi, page_numbers=ocr_page_numbers)
+                page_task = functools.partial(self._ocr_page, deadline=deadline)
+            pages = timed(pages, STAGE_SECONDS.labels('ocr', 'render'))
+            page_results += self.run_page_stream(page_task, self._until(deadline, pages), memory)
+            
+            # Pages never rendered because the document ran out of time
+            done = {page.page_number for page in page_results}
+            page_results += [
+                self._failed_page(n, 'document_timeout', 'render',
+                                  "Document deadline passed before the page was rendered", None)
+                for n in ocr_page_numbers if n not in done
+            ]
         except Exception as e:
             self.logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
-            return "", 0.0
+            return DocumentResult(metadata={'error': str(e)})
+        
+        result = DocumentResult.from_pages(page_results)
+        result.metadata['pages'] = len(page_results)
+        result.metadata['text_layer_pages'] = [p.page_number for p in result.pages if p.source == 'text_layer']
+        result.metadata['ocr_pages'] = [p.page_number for p in result.pages if p.source == 'ocr']
+        result.metadata['page_cache_pages'] = [p.page_number for p in result.pages if p.source == 'page_cache']
+        result.metadata['blank_pages'] = [p.page_number for p in result.pages if p.source == 'blank']
+        self._note_page_failures(result)
+        if self.dpi_mode == 'progressive':
+            result.metadata['escalated_pages'] = [p.page_number for p in result.pages if p.dpi == self.dpi]
+        result.metadata['peak_rss_mb'] = memory.peak_mb
+        return result
+
+    def process_pdf(self, pdf_path):
+        """Process PDF with high-quality conversion and adaptive processing"""
+        result = self.extract_cached(pdf_path, self.extract_pdf)
+        return result.text, result.confidence
 
-    def process_file(self, file_path):
+    def cache_settings(self):
+        """Settings that change OCR output and therefore belong in the cache key"""
+        return {
+            'ocr_engine': self.ocr_engine,
+            'language': self.language,
+            'tesseract_mode': self.tesseract_mode,
+            'confidence_threshold': self.confidence_threshold,
+            'dpi': self.dpi,
+            'dpi_mode': self.dpi_mode,
+            'low_dpi': self.low_dpi,
+            'escalation_confidence': self.escalation_confidence,
+            'min_char_density': self.min_char_density,
+            'use_text_layer': self.use_text_layer,
+            'min_text_layer_chars': self.min_text_layer_chars,
+            'region_ocr': self.region_ocr,
+            'max_regions': self.max_regions,
+            'blank_sensitivity': self.blank_sensitivity,
+            'cascade_confidence': self.cascade_confidence,
+            'page_cache': self.page_cache is not None,
+        }
+
+    @property
+    def _settings_key(self):
+        """Short identifier of cache_settings() used to tag cached pages"""
+        settings = json.dumps(self.cache_settings(), sort_keys=True)
+        return hashlib.sha1(settings.encode('utf-8')).hexdigest()
+
+    def get_cache_stats(self):
+        """Statistics of the document and page caches (None when disabled)"""
+        return {
+            'documents': self.cache.get_stats() if self.cache else None,
+            'pages': self.page_cache.get_stats() if self.page_cache else None,
+        }
+
+    def extract_cached(self, file_path, extractor):
         """
-        Process a file (either PDF or image)
+        Run an extractor through the OCR result cache
         
         Args:
-            file_path (str): Path to the file
+            file_path (str): File to process
+            extractor (callable): Produces a DocumentResult on a cache miss
+        
+        Returns:
+            DocumentResult: Cached or freshly extracted result
         """
-        file_path = Path(file_path)
-        output_file = Path(self.output_dir) / f"{file_path.stem}.txt"
-        metadata_file = Path(self.output_dir) / f"{file_path.stem}_metadata.txt"
+        if self.cache is None:
+            return self._run_extractor(file_path, extractor)
+        
+        key = self.cache.make_key(file_path, self.cache_settings())
+        result = self.cache.get(key)
+        CACHE_REQUESTS.labels('document', 'miss' if result is None else 'hit').inc()
+        if result is not None:
+            self.logger.info(f"OCR cache hit: {file_path}")
+            return result
+        
+        result = self._run_extractor(file_path, extractor)
+        # Failures and half-resolution fallbacks are not cached so the file is retried next time
+        if ('error' not in result.metadata and not result.metadata.get('failed_pages')
+                and not result.metadata.get('fallback_pages')):
+            self.cache.put(key, result)
+        return result
 
-        self.logger.info(f"Processing file: {file_path}")
+    def _run_extractor(self, file_path, extractor):
+        """Run an extractor, recording document latency, pages and errors"""
+        with STAGE_SECONDS.labels('ocr', 'document').time():
+            result = extractor(file_path)
+        
+        if 'error' in result.metadata:
+            ERRORS.labels('ocr', 'document_error').inc()
+        for page in result.pages:
+            PAGES.labels(page.source).inc()
+        return result
 
-        # Determine file type and process accordingly
+    def extract_document(self, file_path):
+        """
+        Run OCR on a file (either PDF or image) without writing any output
+        
+        Args:
+            file_path (str): Path to the file
+        
+        Returns:
+            DocumentResult: Extracted text and metadata, or None for unsupported files
+        """
+        file_path = Path(file_path)
+        
+        start = time.perf_counter()
         if file_path.suffix.lower() == '.pdf':
-            text, confidence = self.process_pdf(file_path)
-        elif file_path.suffix.lower() in ('.png', '.jpg', '.jpeg', '.tiff', '.bmp'):
-            text, confidence = self.process_image(file_path)
+            result = self.extract_cached(file_path, self.extract_pdf)
+        elif file_path.suffix.lower() in ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'):
+            result = self.extract_cached(file_path, self.extract_image)
         else:
-            self.logger.warning(f"Unsupported file type: {file_path}")
-            return
+            return None
+        result.metadata['seconds'] = round(time.perf_counter() - start, 3)
+        return result
 
+    def build_record(self, file_path, result, output_stem=None):
+        """
+        Structured output record for a processed file
+        
+        Returns:
+            dict: Document and per-page text, word boxes and confidences,
+                the settings used and timings
+        """
+        file_path = Path(file_path)
+        record = result.to_dict()
+        page_seconds = [page.seconds for page in result.pages if page.seconds is not None]
+        return {
+            'source': str(file_path),
+            'output': str(output_stem or file_path.stem),
+            'text': record['text'],
+            'confidence': record['confidence'],
+            'pages': record['pages'],
+            'metadata': record['metadata'],
+            'settings': self.cache_settings(),
+            'timings': {
+                'document_seconds': result.metadata.get('seconds'),
+                'ocr_seconds': round(sum(page_seconds), 3),
+            },
+            'processed_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+
+    def save_result(self, file_path, result, output_stem=None, on_commit=None):
+        """
+        Write extracted text and metadata for a processed file
+        
+        With a JSONL/Parquet output format the result is appended to the
+        current shard instead of being written as separate files.
+        
+        Args:
+            file_path (str): Path of the source file
+            result (DocumentResult): OCR result for the file
+            output_stem (Path): Output path relative to output_dir, without
+                extension (defaults to the file's stem)
+            on_commit (callable): Called with the output path once the
+                result is on disk (None if nothing was written)
+        
+        Returns:
+            Path: Text file or shard written, or None if nothing was extracted
+        """
+        file_path = Path(file_path)
+        if self.sink is not None:
+            return self.sink.write(self.build_record(file_path, result, output_stem), on_commit)
+        
+        output_stem = Path(output_stem or file_path.stem)
+        output_file = Path(self.output_dir) / output_stem.parent / f"{output_stem.name}.txt"
+        metadata_file = Path(self.output_dir) / output_stem.parent / f"{output_stem.name}_metadata.txt"
+        
         # Save the extracted text and metadata
-        if text:
+        if result.text:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            
             # Save the main text
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(text)
+                f.write(result.text)
             
             # Save metadata
             with open(metadata_file, 'w', encoding='utf-8') as f:
                 f.write(f"File: {file_path.name}\n")
                 f.write(f"OCR Engine: {self.ocr_engine}\n")
-                f.write(f"Confidence Score: {confidence:.2f}%\n")
+                f.write(f"Confidence Score: {result.confidence:.2f}%\n")
                 f.write(f"Language: {self.language}\n")
+                for key, value in result.metadata.items():
+                    f.write(f"{key}: {value}\n")
             
             self.logger.info(f"Text saved to: {output_file}")
-            self.logger.info(f"Confidence Score: {confidence:.2f}%")
+            self.logger.info(f"Confidence Score: {result.confidence:.2f}%")
         else:
             self.logger.warning(f"No text extracted from: {file_path}")
+            output_file = None
+        
+        if on_commit is not None:
+            on_commit(output_file)
+        return output_file
 
-    def batch_process(self, input_dir, max_workers=4):
+    def process_file(self, file_path, output_stem=None):
         """
-        Process all supported files in a directory using parallel processing
+        Process a file (either PDF or image) and save its output
+        
+        Args:
+            file_path (str): Path to the file
+            output_stem (Path): Output path relative to output_dir, without extension
+        
+        Returns:
+            tuple: (extracted text, confidence score)
+        """
+        self.logger.info(f"Processing file: {file_path}")
+        
+        result = self.extract_document(file_path)
+        if result is None:
+            self.logger.warning(f"Unsupported file type: {file_path}")
+            return "", 0.0
+        
+        self.save_result(file_path, result, output_stem)
+        return result.text, result.confidence
+
+    @staticmethod
+    def output_stems(input_path, files):
+        """
+        Output paths for a batch, mirroring the input directory tree
+        
+        Files sharing a stem in the same directory (scan.pdf, scan.png) keep
+        their extension in the name so neither overwrites the other.
+        
+        Returns:
+            dict: File path -> output path relative to output_dir, without extension
+        """
+        stems = {f: f.relative_to(input_path).with_suffix('') for f in files}
+        counts = {}
+        for stem in stems.values():
+            counts[stem] = counts.get(stem, 0) + 1
+        return {
+            f: stem if counts[stem] == 1 else stem.with_name(f"{stem.name}_{f.suffix.lstrip('.').lower()}")
+            for f, stem in stems.items()
+        }
+
+    def manifest_key(self, job=None):
+        """
+        Key files are recorded under in the job manifest
+        
+        Args:
+            job (str): What else the run does with the text, e.g. the vector
+                index it feeds; runs for different jobs don't skip each
+                other's files
+        """
+        if job is None:
+            return self._settings_key
+        return hashlib.sha1(f"{self._settings_key}|{job}".encode('utf-8')).hexdigest()
+
+    def record_in_manifest(self, manifest, file_path, result, output, job=None):
+        """Note how a batch file ended in the job manifest"""
+        if manifest is None:
+            return
+        settings_key = self.manifest_key(job)
+        if 'error' in result.metadata:
+            manifest.record(file_path, settings_key, JobManifest.FAILED, error=result.metadata['error'])
+        elif result.metadata.get('failed_pages'):
+            # Partial text was written, but the file is retried next run
+            failures = ', '.join(f"page {f['page']}: {f['reason']}" for f in result.metadata['failures'])
+            manifest.record(file_path, settings_key, JobManifest.FAILED, output=output, error=failures)
+        elif not result.text:
+            manifest.record(file_path, settings_key, JobManifest.EMPTY)
+        else:
+            manifest.record(file_path, settings_key, JobManifest.DONE, output=output)
+
+    def save_batch_result(self, file_path, result, output_stem, on_commit=None):
+        """
+        Save a batch file's result, turning write errors into a failed result
+        
+        Args:
+            on_commit (callable): Called with the output path once it is on disk
+        """
+        try:
+            self.save_result(file_path, result, output_stem, on_commit)
+        except OSError as e:
+            self.logger.error(f"Error saving result for {file_path}: {str(e)}")
+            result.metadata['error'] = str(e)
+            if on_commit is not None:
+                on_commit(None)
+
+    def _record_file(self, manifest, file_path, result, output_stem):
+        """Save a batch file's result and note the outcome in the manifest once it is on disk"""
+        self.save_batch_result(
+            file_path, result, output_stem,
+            lambda output: self.record_in_manifest(manifest, file_path, result, output)
+        )
+
+    def _extract_batch_file(self, file_path):
+        """Thread executor task: OCR one file without saving it"""
+        self.logger.info(f"Processing file: {file_path}")
+        return file_path, self.extract_document(file_path)
+
+    def get_settings(self):
+        """Constructor arguments needed to rebuild this processor in a worker process"""
+        return {
+            'output_dir': self.output_dir,
+            'ocr_engine': self.ocr_engine,
+            'language': self.language,
+            'tesseract_mode': self.tesseract_mode,
+            'confidence_threshold': self.confidence_threshold,
+            'page_workers': self.page_workers,
+            'cpu_budget': self.budget.slots,
+            'dpi': self.dpi,
+            'dpi_mode': self.dpi_mode,
+            'low_dpi': self.low_dpi,
+            'escalation_confidence': self.escalation_confidence,
+            'min_char_density': self.min_char_density,
+            'max_pages_in_memory': self.max_pages_in_memory,
+            'use_text_layer': self.use_text_layer,
+            'min_text_layer_chars': self.min_text_layer_chars,
+            'cache_dir': str(self.cache.cache_dir) if self.cache else None,
+            'cache_max_bytes': self.cache.max_bytes if self.cache else 1024 * 1024 * 1024,
+            'page_cache': self.page_cache is not None,
+            'region_ocr': self.region_ocr,
+            'max_regions': self.max_regions,
+            'blank_sensitivity': self.blank_sensitivity,
+            'easyocr_batch_size': self.easyocr_batch_size,
+            'cascade_confidence': self.cascade_confidence,
+            'output_format': self.output_format,
+            'shard_max_records': self.shard_max_records,
+            'page_timeout': self.page_timeout,
+            'document_timeout': self.document_timeout,
+            'reader_memory_mb': self.reader_memory_mb,
+            'intra_op_threads': self.intra_op_threads,
+        }
+
+    def close(self):
+        """Publish any buffered output records and release the thread pools and engine"""
+        if self.sink is not None:
+            self.sink.close()
+        # Page tasks submit region crops, so the page pool goes first
+        with self._page_executor_lock:
+            executors = [self._page_executor, self._region_executor]
+            self._page_executor = self._region_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.engine.close()
+
+    def prepare_batch(self, input_dir, incremental=False, manifest_path=None, job=None):
+        """
+        Find the files of a batch and where their outputs go
         
         Args:
             input_dir (str): Directory containing files to process
-            max_workers (int): Maximum number of parallel workers
+            incremental (bool): Drop files the job manifest shows as already
+                processed with the same content and settings
+            manifest_path (str): Manifest database (defaults to
+                manifest.sqlite in output_dir)
+            job (str): Scopes the manifest key, see manifest_key
+        
+        Returns:
+            tuple: (files to process, {file: output stem}, JobManifest or None)
         """
         input_path = Path(input_dir)
-        supported_extensions = {'.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp'}
+        supported_extensions = {'.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
         
         # Get list of all supported files (recursive search)
         files_to_process = [
@@ -307,28 +1402,267 @@ class OCRProcessor:
         
         if not files_to_process:
             self.logger.warning(f"No supported files found in {input_dir}")
-            return
+            return [], {}, None
         
         self.logger.info(f"Found {len(files_to_process)} files to process")
+        output_stems = self.output_stems(input_path, files_to_process)
+        
+        manifest = None
+        if incremental:
+            manifest = JobManifest(manifest_path or Path(self.output_dir) / 'manifest.sqlite')
+            settings_key = self.manifest_key(job)
+            found = len(files_to_process)
+            files_to_process = [f for f in files_to_process if not manifest.is_unchanged(f, settings_key)]
+            self.logger.info(f"Skipping {found - len(files_to_process)} unchanged files, "
+                             f"{len(files_to_process)} new, changed or unfinished")
+        
+        return files_to_process, output_stems, manifest
+
+    def iter_batch_results(self, files_to_process, max_workers=None, executor='thread',
+                           chunksize=None, max_in_flight=None):
+        """
+        OCR files in parallel, yielding results as they complete
+        
+        Nothing is saved here. At most ``max_in_flight`` files (or
+        max_workers chunks, if more) are being processed or waiting to be
+        consumed, so a slow consumer holds back OCR instead of piling up
+        results.
+        
+        Args:
+            files_to_process (list): Files to OCR
+            max_workers (int): Maximum number of parallel workers (defaults
+                to the CPU budget)
+            executor (str): 'thread' or 'process', see batch_process
+            chunksize (int): Files handed to a worker process at a time
+            max_in_flight (int): Backlog of submitted files (defaults to 2 x max_workers)
         
-        # Process files in parallel with progress bar
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            list(tqdm(
-                executor.map(self.process_file, files_to_process),
-                total=len(files_to_process),
-                desc="Processing files"
+        Yields:
+            tuple: (file path, DocumentResult)
+        """
+        max_workers = max_workers or self.budget.slots
+        max_in_flight = max_in_flight or max_workers * 2
+        if executor == 'process':
+            yield from self._iter_pool_results(files_to_process, max_workers, chunksize, max_in_flight)
+            return
+        
+        files = iter(files_to_process)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = set()
+            while True:
+                for file_path in files:
+                    pending.add(pool.submit(self._extract_batch_file, file_path))
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, result = future.result()
+                    if result is not None:
+                        yield file_path, result
+
+    def batch_process(self, input_dir, max_workers=None, executor='thread', chunksize=None,
+                      incremental=False, manifest_path=None):
+        """
+        Process all supported files in a directory using parallel processing
+        
+        Outputs mirror the input directory tree under output_dir.
+        
+        Args:
+            input_dir (str): Directory containing files to process
+            max_workers (int): Maximum number of parallel workers (defaults
+                to the CPU budget)
+            executor (str): 'thread' shares this processor between threads;
+                'process' gives every worker process its own processor and engine
+            chunksize (int): Files handed to a worker process at a time
+                (process executor only, defaults to an even split)
+            incremental (bool): Skip files the job manifest shows as already
+                processed with the same content and settings
+            manifest_path (str): Manifest database (defaults to
+                manifest.sqlite in output_dir)
+        """
+        files_to_process, output_stems, manifest = self.prepare_batch(input_dir, incremental, manifest_path)
+        if not files_to_process:
+            return
+        
+        # Workers OCR in parallel; outputs are written here as results arrive
+        start = time.perf_counter()
+        results = self.iter_batch_results(files_to_process, max_workers, executor, chunksize)
+        for file_path, result in tqdm(results, total=len(files_to_process), desc="Processing files"):
+            self._record_file(manifest, file_path, result, output_stems[file_path])
+        
+        # Publish the last shard so its files count as done in the manifest
+        if self.sink is not None:
+            self.sink.flush()
+        
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Processed {len(files_to_process)} files in {elapsed:.1f}s "
+                         f"({len(files_to_process) / elapsed:.2f} files/sec)")
+        engine_stats = self.engine.get_stats()
+        if engine_stats:
+            self.logger.info(f"{self.ocr_engine} engine stats: " + ', '.join(
+                f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}"
+                for name, value in engine_stats.items()
             ))
+        if self.dpi_mode == 'progressive':
+            dpi_stats = self.get_dpi_stats()
+            self.logger.info(f"Progressive DPI: {dpi_stats['escalated']} of {dpi_stats['pages']} pages "
+                             f"re-rendered at {self.dpi} DPI ({dpi_stats['escalation_rate']:.1%}), "
+                             f"low_confidence={dpi_stats['low_confidence']}, "
+                             f"low_density={dpi_stats['low_density']}")
 
-def main():
-    import argparse
-    from kaggle_datasets import KaggleDatasetManager
+    def _iter_pool_results(self, files_to_process, max_workers, chunksize=None, max_in_flight=None):
+        """
+        OCR files in a pool of worker processes
+        
+        Workers only run OCR; results are streamed back as they complete so
+        progress and output stay in the parent process. Chunks are submitted
+        in a window of ``max_in_flight`` files (at least one chunk per
+        worker) and the next one only once a result has been consumed.
+        """
+        chunksize = chunksize or 1
+        max_in_flight = max_in_flight or max_workers * 2
+        window = max(max_workers, -(-max_in_flight // chunksize))
+        chunks = (files_to_process[i:i + chunksize] for i in range(0, len(files_to_process), chunksize))
+        
+        # Filled by the pool's result thread: a chunk's results and DPI counts, or the worker's exception
+        done = queue.Queue()
+        
+        # Spawn so workers never inherit a forked copy of loaded models or threads
+        context = multiprocessing.get_context('spawn')
+        
+        # One semaphore shared by all workers keeps file and page tasks within
+        # the CPU budget across processes
+        semaphore = context.BoundedSemaphore(self.budget.slots)
+        
+        with context.Pool(processes=max_workers, initializer=_init_worker,
+                          initargs=(self.get_settings(), semaphore)) as pool:
+            pending = 0
+            while True:
+                for chunk in chunks:
+                    pool.apply_async(_extract_chunk_in_worker, (chunk,), callback=done.put, error_callback=done.put)
+                    pending += 1
+                    if pending >= window:
+                        break
+                if not pending:
+                    break
+                chunk_results = done.get()
+                pending -= 1
+                if isinstance(chunk_results, BaseException):
+                    raise chunk_results
+                results, dpi_stats = chunk_results
+                self._add_dpi_stats(dpi_stats)
+                for file_path, result in results:
+                    if result is not None:
+                        yield file_path, result
+
+# OCR processor owned by each process-pool worker, built once by _init_worker
+_worker_processor = None
+
+def _init_worker(settings, semaphore=None):
+    """Pool initializer: build this worker's processor and engine once"""
+    global _worker_processor
+    _worker_processor = OCRProcessor(**settings)
+    if semaphore is not None:
+        _worker_processor.budget = WorkBudget(settings['cpu_budget'], semaphore=semaphore)
+        _worker_processor.engine.set_budget(_worker_processor.budget)
+
+def _extract_in_worker(file_path):
+    """Run OCR for one file inside a pool worker"""
+    _worker_processor.logger.info(f"Processing file: {file_path}")
+    return file_path, _worker_processor.extract_document(file_path)
+
+def _extract_chunk_in_worker(files):
+    """
+    Run OCR for a chunk of files inside a pool worker
+    
+    Returns:
+        tuple: ([(file path, DocumentResult)], the chunk's progressive-DPI
+            counts for the parent's get_dpi_stats)
+    """
+    results = [_extract_in_worker(file_path) for file_path in files]
+    return results, _worker_processor._take_dpi_stats()
+
+def autotune(settings, sample_files, candidates=None):
+    """
+    Measure workers x intra-op threads settings on a sample corpus
+    
+    Every candidate gets a fresh processor built from settings, without
+    result caches, and OCRs the whole sample with the thread executor.
+    
+    Args:
+        settings (dict): OCRProcessor arguments, see get_settings
+        sample_files (list): Files representative of the real workload
+        candidates (list): (workers, threads) pairs (defaults to
+            scheduler.thread_candidates())
+    
+    Returns:
+        dict: Best 'workers', 'threads' and 'pages_per_sec' with every
+            candidate's measurement under 'results'
+    """
+    def run_sample(workers, threads):
+        # OpenMP in an in-process engine keeps the limit it was loaded with
+        apply_thread_limits(threads, settings['ocr_engine'].lower())
+        ocr = OCRProcessor(**{**settings, 'cpu_budget': workers, 'intra_op_threads': threads,
+                              'page_workers': None, 'cache_dir': None, 'output_format': 'text'})
+        try:
+            return sum(max(1, len(result.pages))
+                       for _, result in ocr.iter_batch_results(sample_files, workers))
+        finally:
+            ocr.close()
     
+    return autotune_threads(run_sample, candidates)
+
+def _workers_arg(value):
+    """--workers value: a count, or 'auto' to size from the CPU budget"""
+    if value == 'auto':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got '{value}'")
+
+def main():
     parser = argparse.ArgumentParser(description='Advanced OCR Text Extraction')
     parser.add_argument('input_path', nargs='?', help='Input file or directory path')
     parser.add_argument('--output', '-o', default='extracted_text', help='Output directory')
-    parser.add_argument('--engine', '-e', choices=['tesseract', 'easyocr'], default='tesseract', help='OCR engine')
+    parser.add_argument('--engine', '-e', choices=list(ENGINES), default='tesseract', help='OCR engine')
     parser.add_argument('--language', '-l', default='eng', help='Language code')
-    parser.add_argument('--workers', '-w', type=int, default=4, help='Number of parallel workers')
+    parser.add_argument('--workers', '-w', type=_workers_arg, default='auto', help="Number of parallel workers, or 'auto' to match the available CPUs")
+    parser.add_argument('--threads', type=int, help='Intra-op threads per OCR task (defaults to what suits the engine)')
+    parser.add_argument('--autotune', action='store_true', help='Try workers x threads settings on a sample of the input directory and use the fastest')
+    parser.add_argument('--autotune-sample', type=int, default=20, help='Files OCR\'d per --autotune candidate')
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread', help='Parallel execution backend for directories')
+    parser.add_argument('--incremental', action='store_true', help='Skip files already processed with unchanged content and settings')
+    parser.add_argument('--manifest', help='Job manifest database for --incremental (defaults to OUTPUT/manifest.sqlite, or OUTPUT/index_manifest.sqlite with --index)')
+    parser.add_argument('--index', metavar='DB_PATH', help='Stream OCR results of a directory straight into this vector database')
+    parser.add_argument('--embed-batch-size', type=int, default=32, help='Documents per embedding batch with --index')
+    parser.add_argument('--checkpoint-every', type=int, default=500, help='Documents between vector database saves with --index')
+    parser.add_argument('--chunksize', type=int, help='Files per worker task with --executor process (default 1)')
+    parser.add_argument('--page-workers', type=int, help='Parallel page workers for multi-page documents')
+    parser.add_argument('--cpu-budget', type=int, help='Maximum concurrent OCR tasks (defaults to CPU count)')
+    parser.add_argument('--dpi', type=int, default=300, help='PDF rasterization resolution')
+    parser.add_argument('--dpi-mode', choices=['fixed', 'progressive'], default='fixed', help='Render PDFs at --dpi, or low DPI first with selective retries')
+    parser.add_argument('--low-dpi', type=int, default=150, help='First-pass DPI for --dpi-mode progressive')
+    parser.add_argument('--max-pages-in-memory', type=int, help='Cap on rendered page bitmaps held at once across all documents')
+    parser.add_argument('--no-text-layer', action='store_true', help='Always OCR PDF pages, even born-digital ones')
+    parser.add_argument('--cache-dir', default='.ocr_cache', help='OCR result cache directory')
+    parser.add_argument('--cache-max-mb', type=int, default=1024, help='OCR result cache size limit in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the OCR result cache')
+    parser.add_argument('--page-cache', action='store_true', help='Reuse OCR text of pages rescanned from an earlier one (needs --cache-dir)')
+    parser.add_argument('--batch-size', type=int, default=8, help='Images per EasyOCR batch (1 disables batching)')
+    parser.add_argument('--cascade-confidence', type=float, default=60.0, help='Line confidence below which --engine cascade re-reads with EasyOCR')
+    parser.add_argument('--reader-memory-mb', type=int, default=1024, help='EasyOCR model memory across languages before unused readers are unloaded')
+    parser.add_argument('--output-format', choices=['text'] + list(SINKS), default='text', help='Per-file text files, or records in rolling JSONL/Parquet shards')
+    parser.add_argument('--shard-size', type=int, default=10000, help='Records per JSONL/Parquet shard')
+    parser.add_argument('--page-timeout', type=float, default=120.0, help='Seconds per page before OCR is stopped and retried at half resolution (0 disables); '
+                        'with --batch-size 1 and --executor thread EasyOCR runs in killable worker processes, one model copy per concurrent page; '
+                        'a running EasyOCR batch is not stopped')
+    parser.add_argument('--document-timeout', type=float, help='Seconds per document before remaining pages are marked failed')
+    parser.add_argument('--region-ocr', action='store_true', help='OCR only detected text blocks instead of whole pages')
+    parser.add_argument('--blank-sensitivity', type=float, default=1.0, help='Blank page skipping sensitivity (0 disables)')
+    parser.add_argument('--tesseract-mode', choices=['adaptive', 'exhaustive'], default='adaptive', help='Tesseract PSM search strategy')
+    parser.add_argument('--min-confidence', type=float, default=70.0, help='Confidence that stops adaptive retries')
     
     # Kaggle integration
     parser.add_argument('--kaggle-dataset', '-k', help='Kaggle dataset ID (e.g., shaz13/real-world-documents-collections)')
@@ -339,6 +1673,8 @@ def main():
     
     # Handle dataset listing
     if args.list_datasets:
+        from kaggle_datasets import KaggleDatasetManager
+        
         kaggle_manager = KaggleDatasetManager()
         datasets = kaggle_manager.get_popular_ocr_datasets()
         print("\nAvailable popular OCR datasets:")
@@ -350,6 +1686,8 @@ def main():
     # Handle Kaggle dataset download
     input_path = None
     if args.kaggle_dataset or args.popular_dataset:
+        from kaggle_datasets import KaggleDatasetManager
+        
         kaggle_manager = KaggleDatasetManager()
         
         if args.kaggle_dataset:
@@ -368,20 +1706,83 @@ def main():
     else:
         parser.error("Must provide input_path, --kaggle-dataset, or --popular-dataset")
     
+    # Thread limits go first, in-process engines read them when they load
+    _, threads = plan_threads(args.engine.lower(), args.cpu_budget, args.threads)
+    apply_thread_limits(threads, args.engine.lower())
+    
     # Initialize OCR processor
     ocr = OCRProcessor(
         output_dir=args.output,
         ocr_engine=args.engine,
-        language=args.language
+        language=args.language,
+        tesseract_mode=args.tesseract_mode,
+        confidence_threshold=args.min_confidence,
+        page_workers=args.page_workers,
+        cpu_budget=args.cpu_budget,
+        dpi=args.dpi,
+        max_pages_in_memory=args.max_pages_in_memory,
+        dpi_mode=args.dpi_mode,
+        low_dpi=args.low_dpi,
+        use_text_layer=not args.no_text_layer,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        page_cache=args.page_cache,
+        region_ocr=args.region_ocr,
+        blank_sensitivity=args.blank_sensitivity,
+        easyocr_batch_size=args.batch_size,
+        cascade_confidence=args.cascade_confidence,
+        page_timeout=args.page_timeout,
+        document_timeout=args.document_timeout,
+        reader_memory_mb=args.reader_memory_mb,
+        intra_op_threads=args.threads,
+        output_format=args.output_format,
+        shard_max_records=args.shard_size
     )
     
+    workers = args.workers
+    if args.autotune and input_path.is_dir():
+        sample, _, _ = ocr.prepare_batch(input_path)
+        tuned = autotune(ocr.get_settings(), sorted(sample)[:args.autotune_sample])
+        for result in tuned['results']:
+            print(f"  workers={result['workers']:<3} threads={result['threads']:<3} "
+                  f"{result['pages_per_sec']:.2f} pages/sec")
+        print(f"Autotune picked workers={tuned['workers']} threads={tuned['threads']}")
+        
+        settings = ocr.get_settings()
+        ocr.close()
+        apply_thread_limits(tuned['threads'], ocr.ocr_engine)
+        ocr = OCRProcessor(**{**settings, 'cpu_budget': tuned['workers'],
+                              'intra_op_threads': tuned['threads'], 'page_workers': args.page_workers})
+        workers = tuned['workers']
+    
     # Process files
-    if input_path.is_file():
-        ocr.process_file(input_path)
+    if args.index and input_path.is_dir():
+        from vector_db import VectorDatabase
+        from pipeline import IndexingPipeline
+        
+        pipeline = IndexingPipeline(ocr, VectorDatabase(args.index),
+                                    embed_batch_size=args.embed_batch_size,
+                                    checkpoint_every=args.checkpoint_every)
+        stats = pipeline.run(input_path, max_workers=workers, executor=args.executor,
+                             chunksize=args.chunksize, incremental=args.incremental,
+                             manifest_path=args.manifest)
+        print(f"Indexed {stats['indexed']} of {stats['documents']} documents into {args.index}: {stats}")
+    elif input_path.is_file():
+        text, confidence = ocr.process_file(input_path)
+        if args.index and text.strip():
+            from vector_db import VectorDatabase
+            
+            vector_db = VectorDatabase(args.index)
+            vector_db.add_document(text, str(input_path), confidence)
+            vector_db.save()
     elif input_path.is_dir():
-        ocr.batch_process(input_path, max_workers=args.workers)
+        ocr.batch_process(input_path, max_workers=workers,
+                          executor=args.executor, chunksize=args.chunksize,
+                          incremental=args.incremental, manifest_path=args.manifest)
     else:
         print(f"Error: {input_path} is not a valid file or directory")
+    
+    ocr.close()
 
 if __name__ == "__main__":
     main()
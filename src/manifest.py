@@ -0,0 +1,144 @@
+"""
+Job manifest for incremental, resumable batch processing
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+def file_sha256(file_path):
+    """Hex SHA-256 of a file's bytes, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class JobManifest:
+    """
+    Record of every input file a batch job has finished
+
+    Each row holds the input path, size, mtime, content hash, the settings
+    key the file was processed with, where its output went and how it
+    ended. A rerun skips files whose size and mtime are unchanged; files
+    that were only touched are recognised by their content hash. Rows are
+    written as each file completes, so a killed job resumes with the files
+    it had not finished yet. Failed files are always retried.
+    """
+
+    DONE = 'done'        # Text extracted and written
+    EMPTY = 'empty'      # Processed, no text found
+    FAILED = 'failed'    # Error, retried on the next run
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): SQLite file holding the manifest
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._rows = None
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT,
+                    settings TEXT NOT NULL,
+                    output TEXT,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    updated REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self):
+        """Read all rows once, the skip check must not query per file"""
+        if self._rows is None:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT path, size, mtime_ns, sha256, settings, output, status FROM files"
+                ).fetchall()
+            self._rows = {row[0]: row[1:] for row in rows}
+        return self._rows
+
+    def is_unchanged(self, file_path, settings_key):
+        """
+        Whether a file was already processed in its current state
+
+        Args:
+            file_path (Path): Input file
+            settings_key (str): Identifies the settings of this run
+
+        Returns:
+            bool: True if the file can be skipped
+        """
+        path = str(Path(file_path).resolve())
+        row = self._load().get(path)
+        if row is None:
+            return False
+
+        size, mtime_ns, sha256, settings, output, status = row
+        if status == self.FAILED or settings != settings_key:
+            return False
+        if output and not Path(output).exists():
+            return False
+
+        stat = os.stat(path)
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+
+        # Touched but possibly identical: compare content before redoing OCR
+        if sha256 and file_sha256(path) == sha256:
+            self._update_mtime(path, stat.st_mtime_ns)
+            return True
+        return False
+
+    def _update_mtime(self, path, mtime_ns):
+        with self._connect() as conn:
+            conn.execute("UPDATE files SET mtime_ns = ?, updated = ? WHERE path = ?",
+                         (mtime_ns, time.time(), path))
+
+    def record(self, file_path, settings_key, status, output=None, error=None):
+        """
+        Record how a file ended
+
+        Args:
+            file_path (Path): Input file
+            settings_key (str): Identifies the settings of this run
+            status (str): DONE, EMPTY or FAILED
+            output (str): Text file written for the input
+            error (str): Failure reason
+        """
+        path = str(Path(file_path).resolve())
+        stat = os.stat(path)
+        sha256 = file_sha256(path) if status != self.FAILED else None
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256, settings_key,
+                 str(output) if output else None, status, error, time.time())
+            )
+
+    def get_stats(self):
+        """Number of files per status"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
@@ -0,0 +1,53 @@
+"""
+Process memory measurement helpers
+"""
+
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def current_rss_bytes():
+    """
+    Current resident set size of this process in bytes
+
+    Reads /proc on Linux; elsewhere falls back to the lifetime peak reported
+    by getrusage, or None when neither is available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+        return max_rss if os.uname().sysname == 'Darwin' else max_rss * 1024
+    return None
+
+class PeakMemoryTracker:
+    """
+    Track the peak RSS seen while a document is processed
+
+    RSS is process wide, so with several documents in flight the peak covers
+    everything the process was doing at the time.
+    """
+
+    def __init__(self):
+        self.peak_bytes = current_rss_bytes()
+
+    def sample(self):
+        """Record the current RSS"""
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    @property
+    def peak_mb(self):
+        """Peak RSS in MB, or None if it can't be measured"""
+        if self.peak_bytes is None:
+            return None
+        return round(self.peak_bytes / (1024 * 1024), 1)
@@ -0,0 +1,240 @@
+"""
+Process-wide metrics exposed in the Prometheus text format
+
+A small in-process registry instead of prometheus_client, so the CLI and
+workers need no extra dependency; api.py and web_interface.py render it
+on /metrics. Metrics are per process: batch runs with the process executor
+keep their worker counts in the workers.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; OCR of a dense page at 300 DPI can take minutes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    """Metric family: one child per combination of label values"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values, **kwargs):
+        """
+        Child metric for a set of label values
+
+        Args:
+            *values: Label values in labelnames order
+            **kwargs: Label values by name
+
+        Returns:
+            Child with inc/set/observe for those labels
+        """
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self):
+        """Exposition lines for this family"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            lines.extend(self._child_lines(key, child))
+        return lines
+
+    def _child_lines(self, key, child):
+        return [f'{self.name}{_label_text(self.labelnames, key)} {_format_value(child.get())}']
+
+class _Value:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self._value += amount
+
+    def get(self):
+        return self._value
+
+class _GaugeValue(_Value):
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self._lock:
+            self._value = float(value)
+
+    @contextmanager
+    def track_inprogress(self):
+        """Count the block as in progress while it runs"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. pages processed"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight"""
+
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeValue()
+
+class Histogram(_Metric):
+    """Distribution of observations, e.g. stage latency in seconds"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _child_lines(self, key, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _label_text(self.labelnames, key, [('le', _format_value(bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _label_text(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+class Registry:
+    """Set of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def render():
+    """The process-wide registry in the Prometheus text exposition format"""
+    return REGISTRY.render()
+
+def timed(iterable, histogram):
+    """
+    Observe how long each item of an iterator takes to produce
+
+    Used for lazily rendered pages, where the work happens inside next().
+    """
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        histogram.observe(time.perf_counter() - start)
+        yield item
+
+# Shared metrics of the processing pipeline
+STAGE_SECONDS = Histogram(
+    'pipeline_stage_duration_seconds', 'Wall time of each processing stage',
+    ['component', 'stage']
+)
+PAGES = Counter('ocr_pages_total', 'Pages processed by how they were read', ['source'])
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result'])
+ERRORS = Counter('errors_total', 'Errors and failed pages by component and reason', ['component', 'reason'])
+MODEL_LOAD_SECONDS = Histogram(
+    'model_load_duration_seconds', 'Time spent loading models and engine handles', ['model']
+)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests currently being handled', ['app', 'path'])
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Request latency by route and status', ['app', 'path', 'status']
+)
@@ -0,0 +1,489 @@
+"""
+Persistent OCR result caches
+"""
+
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ocr_results import DocumentResult
+
+class _SQLiteStore:
+    """Shared connection handling for the SQLite backed caches"""
+
+    db_path = None
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection committed on success, safe across threads and processes"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+class OCRCache(_SQLiteStore):
+    """
+    Content-addressed cache of document OCR results
+
+    Entries are keyed by a hash of the file bytes plus every setting that
+    changes the OCR output, so renamed or re-uploaded copies of a file hit
+    the same entry. Results live in a SQLite file that can be shared by
+    threads, pool workers and the API, and the least recently used entries
+    are evicted once the stored payloads exceed ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir="ocr_cache", max_bytes=1024 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database
+            max_bytes (int): Size limit of stored results before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "ocr_cache.sqlite"
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_access ON results (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO totals VALUES ('bytes', 0)")
+
+    @staticmethod
+    def make_key(file_path, settings):
+        """
+        Build the cache key for a file
+
+        Args:
+            file_path (str): File whose bytes are hashed
+            settings (dict): Settings that affect the OCR result
+
+        Returns:
+            str: Hex digest identifying file content + settings
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached DocumentResult for a key, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return DocumentResult.from_dict(json.loads(row[0]))
+
+    def put(self, key, result):
+        """Store a DocumentResult, evicting least recently used entries if needed"""
+        payload = json.dumps(result.to_dict())
+        size = len(payload.encode('utf-8'))
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+            conn.execute(
+                "UPDATE totals SET value = value + ? WHERE name = 'bytes'",
+                (size - (old[0] if old else 0),)
+            )
+            evicted = self._evict(conn)
+
+        with self._lock:
+            self.evictions += evicted
+
+    def _evict(self, conn):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        total = conn.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()[0]
+        evicted = 0
+
+        while total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM results ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        conn.execute("UPDATE totals SET value = ? WHERE name = 'bytes'", (total,))
+        return evicted
+
+    def get_stats(self):
+        """Hit/miss/eviction counters for this process plus cache size"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            total = conn.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()[0]
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': total,
+            'max_bytes': self.max_bytes
+        }
+
+def _hamming(a, b):
+    return bin(a ^ b).count('1')
+
+class PageHashCache(_SQLiteStore):
+    """
+    Page-level OCR cache for pages that recur with only scanning noise
+
+    Boilerplate pages (terms and conditions, cover sheets) recur across
+    documents, each copy scanned anew. A page is reduced to its ink map:
+    binarized at full resolution, isolated specks dropped and cropped to the
+    ink's bounding box. A 64-bit DCT hash of the ink map finds candidates
+    within ``max_distance`` bits through eight 8-bit band indexes, and a hit
+    is only accepted once the two ink maps agree at full resolution, see
+    ink_matches. Pages of one template that differ in an invoice number or
+    date share their hash but fail that check. Pages set in type too small
+    for that check to be reliable are never cached, nor are rescans skewed
+    by more than a few tenths of a degree found.
+    """
+
+    HASH_SIZE = 32         # Side of the image the DCT is taken over
+    BANDS = 8              # Indexed 8-bit slices of the hash
+    BLOCK = 256            # Side of the blocks aligned on their own in ink_matches
+    COARSE_SHIFT = 16      # Pixels a block may be displaced, searched at 1/4 resolution
+    TILE = 32              # Side of the tiles fine-aligned within a block
+    FINE_SHIFT = 2         # Pixels a tile may shift after its block's alignment
+    WINDOW = 16            # Side of the window differing ink is summed over
+    MIN_TEXT_HEIGHT = 13   # Median glyph height in pixels below which pages aren't cached
+
+    def __init__(self, cache_dir="ocr_cache", max_entries=10000, max_distance=6, max_diff_pixels=12):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database
+            max_entries (int): Pages kept before least recently used ones are
+                evicted; each keeps its compressed ink map, tens of KB
+            max_distance (int): Hash bits allowed to differ (at most 7 is
+                guaranteed to be found by the band index); rescans skewed
+                by a few tenths of a degree differ in up to 6
+            max_diff_pixels (int): Differing ink pixels allowed in any
+                WINDOW x WINDOW window after alignment; scanning noise
+                stays under 10, a changed digit of 7 pt text at 300 DPI
+                differs by 20 or more
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # v3: ink maps verified at full resolution, older entries are never read
+        self.db_path = self.cache_dir / "page_cache_v3.sqlite"
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.max_diff_pixels = max_diff_pixels
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # Hash matched but the ink maps did not
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    id INTEGER PRIMARY KEY,
+                    settings TEXT NOT NULL,
+                    phash TEXT NOT NULL,
+                    band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,
+                    band4 INTEGER, band5 INTEGER, band6 INTEGER, band7 INTEGER,
+                    ink BLOB NOT NULL,
+                    text TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            for band in range(self.BANDS):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_pages_band{band} ON pages (band{band})")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_access ON pages (last_access)")
+
+    @staticmethod
+    def ink_map(image):
+        """
+        Binarized ink of a page without isolated specks, cropped to its bounding box
+        plus a small margin
+
+        Components smaller than a small character are dropped only when no
+        larger ink is nearby, so dust in the margins goes but periods and
+        the dots of an i stay.
+
+        Args:
+            image: PIL Image or numpy array of the page
+
+        Returns:
+            numpy.ndarray: uint8 array of 0 and 1
+        """
+        gray = np.asarray(image)
+        if gray.ndim == 3:
+            gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+
+        binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        min_area = max(4, int(gray.size * 2e-6))
+        large = stats[:, cv2.CC_STAT_AREA] >= min_area
+        large[0] = False
+
+        # Small components within reach of larger ink are punctuation
+        reach = max(3, int(min(gray.shape[:2]) * 0.01))
+        near = cv2.dilate(large[labels].astype(np.uint8), np.ones((2 * reach + 1, 2 * reach + 1), np.uint8))
+        keep = large.copy()
+        keep[np.unique(labels[(near > 0) & ~large[labels]])] = True
+        keep[0] = False
+        ink = keep[labels].astype(np.uint8)
+
+        # Cropped to the larger components, which specks next to the text can't widen
+        points = cv2.findNonZero(large[labels].astype(np.uint8))
+        if points is None:
+            return ink[:0, :0]
+        x, y, width, height = cv2.boundingRect(points)
+        # A margin keeps ink at the edge comparable when scans are slightly skewed
+        margin = 8
+        top, left = max(0, y - margin), max(0, x - margin)
+        return np.ascontiguousarray(ink[top:y + height + margin, left:x + width + margin])
+
+    @classmethod
+    def verifiable(cls, ink):
+        """
+        Whether the page's text is large enough for ink_matches to tell
+        a changed character from noise
+
+        Args:
+            ink (numpy.ndarray): Ink map from ink_map
+
+        Returns:
+            bool: False for blank pages and fine print, which are not cached
+        """
+        if ink.size == 0:
+            return False
+        _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT][stats[1:, cv2.CC_STAT_AREA] >= 4]
+        return heights.size > 0 and np.median(heights) >= cls.MIN_TEXT_HEIGHT
+
+    @classmethod
+    def _phash(cls, ink):
+        """64-bit DCT hash of an ink map"""
+        if ink.size == 0:
+            return 0
+        small = cv2.resize(ink.astype(np.float32), (cls.HASH_SIZE, cls.HASH_SIZE), interpolation=cv2.INTER_AREA)
+
+        # Low-frequency DCT coefficients compared to their median
+        dct = cv2.dct(small)[:8, :8].flatten()
+        bits = dct > np.median(dct[1:])
+        phash = 0
+        for bit in bits:
+            phash = (phash << 1) | int(bit)
+        return phash
+
+    @classmethod
+    def fingerprint(cls, image):
+        """
+        Perceptual hash and ink map of a page
+
+        Args:
+            image: PIL Image or numpy array of the page
+
+        Returns:
+            tuple: (64-bit hash as int, ink map from ink_map)
+        """
+        ink = cls.ink_map(image)
+        return cls._phash(ink), ink
+
+    def ink_matches(self, ink, other):
+        """
+        Whether two ink maps show the same page up to scanning noise
+
+        The maps are aligned as a whole by phase correlation, every
+        BLOCK x BLOCK block by a coarse search at quarter resolution and
+        every TILE x TILE tile by up to FINE_SHIFT pixels, which absorbs
+        shifts, slight skew and scale differences between scans. The
+        aligned maps are XORed and opened with a 2 x 2 kernel, removing the
+        one-pixel slivers that noise leaves along stroke edges. Any
+        WINDOW x WINDOW window with more than max_diff_pixels differing
+        pixels left, such as a changed digit, rejects the match.
+
+        Args:
+            ink (numpy.ndarray): Ink map from ink_map
+            other (numpy.ndarray): Ink map to compare with
+
+        Returns:
+            bool: True if the pages match
+        """
+        if ink.size == 0 or other.size == 0:
+            return ink.size == other.size
+        slack = self.COARSE_SHIFT + max(ink.shape) // 100
+        if abs(ink.shape[0] - other.shape[0]) > slack or abs(ink.shape[1] - other.shape[1]) > slack:
+            return False
+
+        # Common canvas padded to whole blocks
+        block = self.BLOCK
+        height = -(-max(ink.shape[0], other.shape[0]) // block) * block
+        width = -(-max(ink.shape[1], other.shape[1]) // block) * block
+        a = np.zeros((height, width), np.uint8)
+        b = np.zeros((height, width), np.uint8)
+        a[:ink.shape[0], :ink.shape[1]] = ink
+        b[:other.shape[0], :other.shape[1]] = other
+
+        # Content of b at p + (dx, dy) lines up with a at p
+        (dx, dy), _ = cv2.phaseCorrelate(a.astype(np.float32), b.astype(np.float32))
+        dx, dy = int(round(dx)), int(round(dy))
+        margin = max(abs(dx), abs(dy)) + self.COARSE_SHIFT + 2 * self.FINE_SHIFT + 2
+        b = np.pad(b, margin)
+
+        def window(x, y, shift_x, shift_y):
+            top, left = margin + y + dy + shift_y, margin + x + dx + shift_x
+            return b[top:top + block, left:left + block]
+
+        def quarter(array):
+            return cv2.resize(array.astype(np.float32), (block // 4, block // 4), interpolation=cv2.INTER_AREA)
+
+        coarse = range(-self.COARSE_SHIFT, self.COARSE_SHIFT + 1, 4)
+        fine = range(-self.FINE_SHIFT, self.FINE_SHIFT + 1)
+        tiles = (block // self.TILE, self.TILE, block // self.TILE, self.TILE)
+        diff = np.zeros((height, width), np.uint8)
+        for y in range(0, height, block):
+            for x in range(0, width, block):
+                a_block = a[y:y + block, x:x + block]
+                if not a_block.any() and not window(x, y, 0, 0).any():
+                    continue
+
+                # Coarse block offset, preferring the smallest among equals
+                a_small = quarter(a_block)
+                cx, cy = min(((sx, sy) for sy in coarse for sx in coarse), key=lambda s: (
+                    float(np.abs(a_small - quarter(window(x, y, *s))).sum()), abs(s[0]) + abs(s[1])))
+                # Block offset to the pixel, then the best shift per tile
+                bx, by = min(((cx + sx, cy + sy) for sy in fine for sx in fine),
+                             key=lambda s: int((a_block ^ window(x, y, *s)).sum()))
+                xors = np.stack([a_block ^ window(x, y, bx + sx, by + sy) for sy in fine for sx in fine])
+                best = xors.reshape(len(xors), *tiles).sum(axis=(2, 4)).argmin(axis=0)
+                pick = np.kron(best, np.ones((self.TILE, self.TILE), np.intp))
+                diff[y:y + block, x:x + block] = np.take_along_axis(xors, pick[None], axis=0)[0]
+
+        diff = cv2.morphologyEx(diff, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+        window_sums = cv2.boxFilter(diff.astype(np.float32), -1, (self.WINDOW, self.WINDOW), normalize=False,
+                                    borderType=cv2.BORDER_CONSTANT)
+        return window_sums.max() <= self.max_diff_pixels
+
+    @classmethod
+    def _bands(cls, phash):
+        return [(phash >> (8 * i)) & 0xFF for i in range(cls.BANDS)]
+
+    def get(self, image, settings_key):
+        """
+        Look up OCR results for the same page scanned before
+
+        Args:
+            image: Page bitmap
+            settings_key (str): Identifies the OCR settings the text was produced with
+
+        Returns:
+            tuple: ((text, confidence) or None, fingerprint to pass to put)
+        """
+        phash, ink = self.fingerprint(image)
+        if not self.verifiable(ink):
+            with self._lock:
+                self.misses += 1
+            return None, (phash, ink)
+        bands = self._bands(phash)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, phash, ink, text, confidence FROM pages WHERE settings = ? "
+                "AND (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ? "
+                "OR band4 = ? OR band5 = ? OR band6 = ? OR band7 = ?)",
+                (settings_key, *bands)
+            ).fetchall()
+
+        match, match_id, rejected = None, None, 0
+        for row_id, row_hash, row_ink, text, confidence in rows:
+            if _hamming(phash, int(row_hash, 16)) > self.max_distance:
+                continue
+            stored = (cv2.imdecode(np.frombuffer(row_ink, dtype=np.uint8), cv2.IMREAD_GRAYSCALE) > 0).astype(np.uint8)
+            if not self.ink_matches(ink, stored):
+                rejected += 1
+                continue
+            match, match_id = (text, confidence), row_id
+            break
+
+        if match_id is not None:
+            with self._connect() as conn:
+                conn.execute("UPDATE pages SET last_access = ? WHERE id = ?", (time.time(), match_id))
+
+        with self._lock:
+            self.rejected += rejected
+            if match is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return match, (phash, ink)
+
+    def put(self, fingerprint, settings_key, text, confidence):
+        """Store OCR results for a page fingerprinted by get()"""
+        phash, ink = fingerprint
+        if not self.verifiable(ink):
+            return
+        # Bilevel PNG keeps a 300 DPI ink map to tens of KB
+        encoded = cv2.imencode('.png', ink, [cv2.IMWRITE_PNG_BILEVEL, 1])[1]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pages (settings, phash, band0, band1, band2, band3, band4, band5, band6, band7, "
+                "ink, text, confidence, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (settings_key, f"{phash:016x}", *self._bands(phash), encoded.tobytes(), text, confidence,
+                 time.time())
+            )
+            count = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM pages WHERE id IN (SELECT id FROM pages ORDER BY last_access LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def get_stats(self):
+        """Hit/miss counters for this process plus cache size"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'rejected': self.rejected,
+            'entries': entries,
+            'max_entries': self.max_entries
+        }
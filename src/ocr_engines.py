@@ -0,0 +1,803 @@
+"""
+OCR engine backends used by OCRProcessor
+
+Every engine exposes the same small interface so the processor does not care
+whether Tesseract runs as a subprocess, in-process through its C API, or
+whether EasyOCR is doing the recognition.
+"""
+
+import importlib.util
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import numpy as np
+import cv2
+from PIL import Image
+import pytesseract
+from reader_pool import get_reader_pool, easyocr_languages
+from metrics import MODEL_LOAD_SECONDS
+
+# tesserocr loads libtesseract and its OpenMP runtime, which reads
+# OMP_THREAD_LIMIT only then, so it is imported by the engine that uses it
+# after scheduler.apply_thread_limits
+TESSEROCR_AVAILABLE = importlib.util.find_spec('tesserocr') is not None
+
+# Columns of pytesseract.Output.DICT, returned by every engine's image_to_data
+DATA_FIELDS = (
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text'
+)
+
+class OCREngineError(RuntimeError):
+    """Raised when an engine fails to recognize an image"""
+
+class OCRTimeoutError(OCREngineError):
+    """Raised when recognition does not finish within its timeout"""
+
+class OCREngine:
+    """Base class for OCR backends"""
+
+    name = 'base'
+    family = None  # 'tesseract' or 'easyocr', decides the processing pipeline
+    batched = False  # Callers wait on a shared batch instead of computing themselves
+
+    def __init__(self, language='eng'):
+        self.language = language
+
+    def image_to_data(self, image, psm=6, timeout=None):
+        """
+        Recognize an image and return word-level results
+
+        Args:
+            image: PIL Image or numpy array
+            psm (int): Tesseract page segmentation mode (ignored by EasyOCR)
+            timeout (float): Seconds before recognition is stopped and
+                OCRTimeoutError raised (None for no limit)
+
+        Returns:
+            dict: Lists keyed by DATA_FIELDS, like pytesseract.Output.DICT
+        """
+        raise NotImplementedError
+
+    def image_to_string(self, image, psm=6, timeout=None):
+        """Recognize an image and return plain text"""
+        data = self.image_to_data(image, psm, timeout)
+        return ' '.join(word for word in data['text'] if word.strip())
+
+    @property
+    def search_engine(self):
+        """Engine for repeated PSM and image variant attempts, see refine"""
+        return self
+
+    def refine(self, image, data, timeout=None):
+        """
+        Second pass over the winning attempt of a search_engine search
+
+        Args:
+            image: Image the data was recognized from
+            data (dict): image_to_data result of search_engine
+            timeout (float): Seconds left for the pass (None for no limit)
+
+        Returns:
+            dict: Improved data, the same data for single-pass engines
+        """
+        return data
+
+    def get_stats(self):
+        """Engine specific throughput counters"""
+        return {}
+
+    def set_budget(self, budget):
+        """WorkBudget for work the engine runs on its own threads"""
+
+    def close(self):
+        """Release any resources held by the engine"""
+
+class TesseractSubprocessEngine(OCREngine):
+    """Tesseract through pytesseract, one tesseract process per call"""
+
+    name = 'tesseract'
+    family = 'tesseract'
+
+    # pytesseract kills the tesseract process on timeout and raises a plain
+    # RuntimeError with this message
+    _TIMEOUT_MESSAGE = 'Tesseract process timeout'
+
+    def _error(self, e, timeout):
+        if timeout and self._TIMEOUT_MESSAGE in str(e):
+            return OCRTimeoutError(f"Tesseract did not finish within {timeout:.1f}s")
+        return OCREngineError(str(e))
+
+    def image_to_data(self, image, psm=6, timeout=None):
+        try:
+            return pytesseract.image_to_data(
+                image, lang=self.language, config=f'--psm {psm}',
+                output_type=pytesseract.Output.DICT, timeout=timeout or 0
+            )
+        except (pytesseract.TesseractError, RuntimeError) as e:
+            raise self._error(e, timeout) from e
+
+    def image_to_string(self, image, psm=6, timeout=None):
+        try:
+            return pytesseract.image_to_string(image, lang=self.language, config=f'--psm {psm}',
+                                               timeout=timeout or 0)
+        except (pytesseract.TesseractError, RuntimeError) as e:
+            raise self._error(e, timeout) from e
+
+class TesseractAPIEngine(OCREngine):
+    """
+    In-process Tesseract through the tesserocr C API bindings
+
+    Each worker thread keeps one initialized API handle, so language data is
+    loaded once and images are handed over as raw pixel buffers instead of
+    temp files and a process spawn per call.
+    """
+
+    name = 'tesseract-api'
+    family = 'tesseract'
+
+    def __init__(self, language='eng'):
+        if not TESSEROCR_AVAILABLE:
+            raise ImportError("tesserocr is required for the 'tesseract-api' engine (pip install tesserocr)")
+        import tesserocr
+        super().__init__(language)
+        self._tesserocr = tesserocr
+        self._local = threading.local()
+        self._apis = []
+        self._lock = threading.Lock()
+
+    def _get_api(self):
+        """Return this thread's API handle, creating it on first use"""
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            # Each handle loads the traineddata for its language
+            with MODEL_LOAD_SECONDS.labels(f'tesseract-api/{self.language}').time():
+                api = self._tesserocr.PyTessBaseAPI(lang=self.language)
+            self._local.api = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+
+    def _set_image(self, api, image):
+        """Pass the pixel buffer straight to Tesseract without encoding it"""
+        if isinstance(image, Image.Image) and image.mode not in ('L', 'RGB', 'RGBA'):
+            image = image.convert('L')
+
+        array = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = array.shape[:2]
+        bytes_per_pixel = 1 if array.ndim == 2 else array.shape[2]
+        api.SetImageBytes(array.tobytes(), width, height, bytes_per_pixel, bytes_per_pixel * width)
+
+    def _recognize(self, image, psm, timeout=None):
+        api = self._get_api()
+        api.SetPageSegMode(psm)
+        self._set_image(api, image)
+        # Tesseract checks the timeout between words and cancels itself,
+        # the handle stays usable for the next call
+        if not api.Recognize(int(timeout * 1000) if timeout else 0):
+            if timeout:
+                raise OCRTimeoutError(f"Tesseract did not finish within {timeout:.1f}s")
+            raise OCREngineError("Tesseract recognition failed")
+        return api
+
+    def image_to_data(self, image, psm=6, timeout=None):
+        try:
+            api = self._recognize(image, psm, timeout)
+            tsv = api.GetTSVText(0)
+        except RuntimeError as e:
+            raise OCREngineError(str(e)) from e
+
+        data = {field: [] for field in DATA_FIELDS}
+        for row in tsv.splitlines():
+            values = row.split('\t', len(DATA_FIELDS) - 1)
+            if len(values) < len(DATA_FIELDS):
+                values.append('')
+            for field, value in zip(DATA_FIELDS, values):
+                if field == 'text':
+                    data[field].append(value)
+                elif field == 'conf':
+                    data[field].append(float(value))
+                else:
+                    data[field].append(int(value))
+        return data
+
+    def image_to_string(self, image, psm=6, timeout=None):
+        try:
+            return self._recognize(image, psm, timeout).GetUTF8Text()
+        except RuntimeError as e:
+            raise OCREngineError(str(e)) from e
+
+    def close(self):
+        with self._lock:
+            for api in self._apis:
+                api.End()
+            self._apis.clear()
+        self._local = threading.local()
+
+class EasyOCRBatcher:
+    """
+    Collects EasyOCR requests from concurrent callers into fixed-size batches
+
+    Page tasks and file threads each submit images and block on a future; a
+    single thread drains the queue into batches of up to ``batch_size``
+    images, waiting at most ``max_wait`` seconds for a batch to fill, runs
+    detection and recognition once per batch and hands every caller its own
+    detections back. Callers must not hold a budget slot while they wait;
+    each batch takes one from ``budget`` instead.
+    """
+
+    def __init__(self, get_reader, batch_size=8, max_wait=0.05, budget=None):
+        """
+        Args:
+            get_reader (callable): Returns the easyocr.Reader, asked once per batch
+            batch_size (int): Images per detector/recognizer call
+            max_wait (float): Seconds a partial batch waits for more images
+            budget (WorkBudget): Budget a slot is taken from per batch
+        """
+        self.get_reader = get_reader
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.budget = budget
+
+        self.images = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='easyocr-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, images):
+        """Queue images for recognition, one Future of detections per image"""
+        futures = []
+        for image in images:
+            future = Future()
+            self._queue.put((image, future))
+            futures.append(future)
+        return futures
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    @staticmethod
+    def _group_by_canvas(batch):
+        """
+        Group images that can share one detector input
+
+        The detector stacks a batch into a single tensor, so images are
+        padded bottom-right onto the canvas of the largest image in their
+        group. Detections keep their coordinates; images that don't fit
+        inside an existing canvas start a new group.
+        """
+        groups = []
+        for image, future in sorted(batch, key=lambda item: -item[0].shape[0] * item[0].shape[1]):
+            height, width = image.shape[:2]
+            for canvas, members in groups:
+                if (height <= canvas[0] and width <= canvas[1] and image.ndim == len(canvas)
+                        and height * width * 1.25 >= canvas[0] * canvas[1]):
+                    members.append((image, future))
+                    break
+            else:
+                groups.append((image.shape, [(image, future)]))
+        return groups
+
+    def _run_batch(self, batch):
+        if self.budget is None:
+            self._recognize_batch(batch)
+        else:
+            with self.budget.slot():
+                self._recognize_batch(batch)
+
+    def _recognize_batch(self, batch):
+        # Callers that timed out cancel their futures; drop those images
+        batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            reader = self.get_reader()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for canvas, members in self._group_by_canvas(batch):
+            images = []
+            for image, _ in members:
+                if image.shape != canvas:
+                    padded = np.full(canvas, 255, dtype=np.uint8)
+                    padded[:image.shape[0], :image.shape[1]] = image
+                    image = padded
+                images.append(image)
+            try:
+                results = reader.readtext_batched(images, batch_size=self.batch_size)
+            except Exception as e:
+                for _, future in members:
+                    future.set_exception(e)
+                continue
+            for (_, future), detections in zip(members, results):
+                future.set_result(detections)
+
+        with self._lock:
+            self.images += len(batch)
+            self.batches += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    def get_stats(self):
+        """Images and batches processed, with throughput in images/sec"""
+        with self._lock:
+            return {
+                'images': self.images,
+                'batches': self.batches,
+                'avg_batch_size': self.images / self.batches if self.batches else 0.0,
+                'images_per_sec': self.images / self.busy_seconds if self.busy_seconds else 0.0,
+            }
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+def _readtext_worker_main(conn, languages, gpu):
+    """Child process of ReadtextWorker: load a reader, then OCR images until the pipe closes"""
+    import easyocr
+    reader = easyocr.Reader(list(languages), gpu=gpu)
+    conn.send((True, None))
+    while True:
+        try:
+            image = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, reader.readtext(image)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+class ReadtextWorker:
+    """
+    EasyOCR reader in a child process, so an overrunning call can be killed
+
+    A running PyTorch call cannot be interrupted in-process. Killing the
+    child frees its CPU at once; the next call starts a fresh worker and
+    pays for loading the model again.
+    """
+
+    def __init__(self, languages, gpu=False):
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_readtext_worker_main, args=(child_conn, languages, gpu),
+                                       name='easyocr-readtext', daemon=True)
+        self.process.start()
+        child_conn.close()
+        # Loading the model is not part of any page's time
+        with MODEL_LOAD_SECONDS.labels(f"easyocr-worker/{'+'.join(languages)}").time():
+            self._receive(None)
+
+    def _receive(self, timeout):
+        try:
+            if timeout is not None and not self._conn.poll(timeout):
+                raise OCRTimeoutError(f"EasyOCR did not finish within {timeout:.1f}s")
+            ok, value = self._conn.recv()
+        except (EOFError, OSError) as e:
+            raise OCREngineError(f"EasyOCR worker exited: {e}") from e
+        if not ok:
+            raise OCREngineError(value)
+        return value
+
+    def readtext(self, image, timeout=None):
+        """
+        Run reader.readtext in the child
+
+        Raises:
+            OCRTimeoutError: The call overran; the worker must be killed
+        """
+        try:
+            self._conn.send(image)
+        except OSError as e:
+            raise OCREngineError(f"EasyOCR worker exited: {e}") from e
+        return self._receive(timeout)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self._conn.close()
+
+    def close(self):
+        # The child exits when its end of the pipe reports EOF
+        self._conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+class EasyOCREngine(OCREngine):
+    """
+    EasyOCR detection + recognition
+
+    Readers come from the process-wide ReaderPool, so the model for the
+    engine's languages is loaded on first use and may be evicted while
+    engines for other languages need the memory.
+    """
+
+    name = 'easyocr'
+    family = 'easyocr'
+
+    def __init__(self, language='eng', gpu=False, batch_size=1, max_reader_bytes=None):
+        """
+        Args:
+            language (str): Tesseract language code(s), e.g. 'eng+fra',
+                mapped to EasyOCR's codes
+            gpu (bool): Run the models on the GPU
+            batch_size (int): Images per batched inference call across
+                concurrent callers (1 runs every image on its own)
+            max_reader_bytes (int): Model weights the shared reader pool
+                keeps resident across all languages
+        """
+        super().__init__(language)
+        self.languages = easyocr_languages(language)
+        self.gpu = gpu
+        self.pool = get_reader_pool(gpu, max_reader_bytes)
+        self.batch_size = batch_size
+        self.batcher = EasyOCRBatcher(self._get_reader, batch_size) if batch_size > 1 else None
+        # Idle ReadtextWorkers for unbatched calls with a timeout
+        self._workers = queue.LifoQueue()
+        self._all_workers = set()
+        self._workers_lock = threading.Lock()
+        self.killed_workers = 0
+
+    def _get_reader(self):
+        return self.pool.get(self.languages)
+
+    @property
+    def reader(self):
+        """Reader for the engine's languages, loaded on first use"""
+        return self._get_reader()
+
+    @property
+    def batched(self):
+        return self.batcher is not None
+
+    def set_budget(self, budget):
+        """Share the processor's WorkBudget with the batching thread"""
+        if self.batcher is not None:
+            self.batcher.budget = budget
+
+    @staticmethod
+    def _to_input(image):
+        img_array = np.asarray(image)
+        if img_array.ndim == 3:
+            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+        # Grayscale pages go in as-is, EasyOCR accepts 2D arrays directly
+        return img_array
+
+    def readtext(self, image, timeout=None):
+        """
+        Run EasyOCR on an image
+
+        Returns:
+            list: (box, text, confidence) detections, confidence in 0-1
+        """
+        return self.readtext_batch([image], timeout)[0]
+
+    def readtext_batch(self, images, timeout=None):
+        """
+        Run EasyOCR on several images, sharing batches with other callers
+
+        A running PyTorch call cannot be interrupted in-process. Unbatched
+        calls with a timeout therefore run in ReadtextWorker processes,
+        one per concurrent caller, and an overrunning worker is killed;
+        inside process-pool workers, which cannot start processes, an
+        overrun is only detected once the call returns.
+        Batched images that have not started yet are withdrawn, but a batch
+        already running finishes.
+
+        Args:
+            images (list): PIL Images or numpy arrays
+            timeout (float): Seconds before OCRTimeoutError is raised
+
+        Returns:
+            list: Detections for each image, in input order
+        """
+        images = [self._to_input(image) for image in images]
+        deadline = time.monotonic() + timeout if timeout else None
+        if self.batcher is None:
+            if deadline is None:
+                reader = self.reader
+                return [reader.readtext(image) for image in images]
+            if multiprocessing.current_process().daemon:
+                # Pool workers may not start processes: the call can't be
+                # killed, but an overrun still fails the page
+                return self._readtext_checked(images, deadline, timeout)
+            worker = self._checkout_worker()
+            reusable = False
+            try:
+                results = []
+                for image in images:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise OCRTimeoutError(f"EasyOCR did not finish within {timeout:.1f}s")
+                    results.append(worker.readtext(image, remaining))
+                reusable = True
+                return results
+            except OCREngineError as e:
+                # An error raised by EasyOCR itself leaves the worker usable
+                reusable = not isinstance(e, OCRTimeoutError) and worker.process.is_alive()
+                raise
+            finally:
+                if reusable:
+                    self._workers.put(worker)
+                else:
+                    self._discard_worker(worker)
+
+        futures = self.batcher.submit(images)
+        try:
+            return [future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+                    for future in futures]
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise OCRTimeoutError(f"EasyOCR did not finish within {timeout:.1f}s") from None
+
+    def _readtext_checked(self, images, deadline, timeout):
+        """In-process readtext that raises OCRTimeoutError once the deadline has passed"""
+        reader = self.reader
+        results = []
+        for image in images:
+            if time.monotonic() >= deadline:
+                raise OCRTimeoutError(f"EasyOCR did not finish within {timeout:.1f}s")
+            results.append(reader.readtext(image))
+        if time.monotonic() >= deadline:
+            raise OCRTimeoutError(f"EasyOCR did not finish within {timeout:.1f}s")
+        return results
+
+    def _checkout_worker(self):
+        """An idle ReadtextWorker, started if every worker is busy"""
+        try:
+            return self._workers.get_nowait()
+        except queue.Empty:
+            pass
+        worker = ReadtextWorker(self.languages, self.gpu)
+        with self._workers_lock:
+            self._all_workers.add(worker)
+        return worker
+
+    def _discard_worker(self, worker):
+        """Kill a worker that overran or broke, stopping its inference"""
+        worker.kill()
+        with self._workers_lock:
+            self._all_workers.discard(worker)
+            self.killed_workers += 1
+
+    def get_stats(self):
+        stats = self.batcher.get_stats() if self.batcher else {}
+        stats.update({f'reader_{name}': value for name, value in self.pool.get_stats().items()})
+        with self._workers_lock:
+            if self._all_workers or self.killed_workers:
+                stats['readtext_workers'] = len(self._all_workers)
+                stats['readtext_workers_killed'] = self.killed_workers
+        return stats
+
+    def image_to_data(self, image, psm=None, timeout=None):
+        data = {field: [] for field in DATA_FIELDS}
+
+        # Each detection becomes one "line" with a single word
+        for i, (box, text, confidence) in enumerate(self.readtext(image, timeout)):
+            xs = [point[0] for point in box]
+            ys = [point[1] for point in box]
+            row = {
+                'level': 5, 'page_num': 1, 'block_num': 1, 'par_num': 1,
+                'line_num': i + 1, 'word_num': 1,
+                'left': int(min(xs)), 'top': int(min(ys)),
+                'width': int(max(xs) - min(xs)), 'height': int(max(ys) - min(ys)),
+                'conf': float(confidence) * 100, 'text': text
+            }
+            for field in DATA_FIELDS:
+                data[field].append(row[field])
+        return data
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+        with self._workers_lock:
+            workers, self._all_workers = self._all_workers, set()
+        for worker in workers:
+            worker.close()
+        self._workers = queue.LifoQueue()
+
+class CascadeEngine(OCREngine):
+    """
+    Tesseract for the whole image, EasyOCR only for the lines it is unsure of
+
+    Lines whose mean word confidence from Tesseract falls below ``cutoff``
+    are re-recognized by EasyOCR's recognizer on their crop, skipping its
+    detector, and replace the Tesseract words when EasyOCR is more
+    confident. The EasyOCR model is only loaded once a weak line shows up.
+    """
+
+    name = 'cascade'
+    family = 'tesseract'
+
+    def __init__(self, language='eng', cutoff=60.0, padding=4, max_reader_bytes=None):
+        """
+        Args:
+            language (str): Tesseract language code
+            cutoff (float): Line confidence (0-100) below which EasyOCR is consulted
+            padding (int): Pixels added around a line before recognizing it
+            max_reader_bytes (int): Resident model limit of the shared EasyOCR reader pool
+        """
+        super().__init__(language)
+        engine_class = TesseractAPIEngine if TESSEROCR_AVAILABLE else TesseractSubprocessEngine
+        self.primary = engine_class(language)
+        self.cutoff = cutoff
+        self.padding = padding
+        self.max_reader_bytes = max_reader_bytes
+        self._secondary = None
+        self._lock = threading.Lock()
+
+        self.lines = 0
+        self.weak_lines = 0
+        self.replaced_lines = 0
+        self.pixels = 0
+        self.weak_pixels = 0
+
+    def _get_reader(self):
+        with self._lock:
+            if self._secondary is None:
+                self._secondary = EasyOCREngine(self.language, max_reader_bytes=self.max_reader_bytes)
+            return self._secondary.reader
+
+    @staticmethod
+    def _line_rows(data):
+        """Word row indexes grouped by Tesseract line"""
+        lines = {}
+        for i, text in enumerate(data['text']):
+            if text.strip() and float(data['conf'][i]) >= 0:
+                key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                lines.setdefault(key, []).append(i)
+        return lines
+
+    @property
+    def search_engine(self):
+        """PSM searches run on Tesseract alone, only the winner is refined"""
+        return self.primary
+
+    def image_to_data(self, image, psm=6, timeout=None):
+        deadline = time.monotonic() + timeout if timeout else None
+        data = self.primary.image_to_data(image, psm, timeout)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return self.refine(image, data, remaining)
+
+    def refine(self, image, data, timeout=None):
+        """Re-recognize the weak lines of Tesseract's data with EasyOCR"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        lines = self._line_rows(data)
+
+        gray = np.asarray(image)
+        if gray.ndim == 3:
+            gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+        height, width = gray.shape[:2]
+
+        weak = []
+        for key, rows in lines.items():
+            confidence = sum(float(data['conf'][i]) for i in rows) / len(rows)
+            if confidence >= self.cutoff:
+                continue
+            x0 = max(0, min(data['left'][i] for i in rows) - self.padding)
+            y0 = max(0, min(data['top'][i] for i in rows) - self.padding)
+            x1 = min(width, max(data['left'][i] + data['width'][i] for i in rows) + self.padding)
+            y1 = min(height, max(data['top'][i] + data['height'][i] for i in rows) + self.padding)
+            if x1 > x0 and y1 > y0:
+                weak.append((key, rows, confidence, (x0, y0, x1, y1)))
+
+        replaced = 0
+        if weak and deadline is not None and time.monotonic() >= deadline:
+            # Out of time for the second opinion, keep Tesseract's words
+            weak = []
+        if weak:
+            # One recognizer call for every weak line: [x_min, x_max, y_min, y_max]
+            # boxes; with the default batch_size results come back in box order
+            boxes = [[x0, x1, y0, y1] for _, _, _, (x0, y0, x1, y1) in weak]
+            try:
+                results = self._get_reader().recognize(gray, horizontal_list=boxes, free_list=[])
+            except Exception as e:
+                raise OCREngineError(f"EasyOCR cascade failed: {e}") from e
+
+            if len(results) == len(weak):
+                data, replaced = self._merge(data, weak, results)
+
+        with self._lock:
+            self.lines += len(lines)
+            self.weak_lines += len(weak)
+            self.replaced_lines += replaced
+            self.pixels += width * height
+            self.weak_pixels += sum((x1 - x0) * (y1 - y0) for *_, (x0, y0, x1, y1) in weak)
+        return data
+
+    @staticmethod
+    def _merge(data, weak, results):
+        """Swap the words of weak lines for EasyOCR's text where it is more confident"""
+        drop = set()
+        added = {}
+        for (key, rows, confidence, (x0, y0, x1, y1)), (_, text, easy_conf) in zip(weak, results):
+            easy_conf = float(easy_conf) * 100
+            if not text.strip() or easy_conf <= confidence:
+                continue
+            drop.update(rows)
+            block_num, par_num, line_num = key
+            # Keyed by the line's first word so it keeps its place in reading order
+            added[rows[0]] = {
+                'level': 5, 'page_num': data['page_num'][rows[0]], 'block_num': block_num,
+                'par_num': par_num, 'line_num': line_num, 'word_num': 1,
+                'left': x0, 'top': y0, 'width': x1 - x0, 'height': y1 - y0,
+                'conf': easy_conf, 'text': text
+            }
+
+        if not added:
+            return data, 0
+
+        merged = {field: [] for field in DATA_FIELDS}
+        for i in range(len(data['text'])):
+            if i in added:
+                for field in DATA_FIELDS:
+                    merged[field].append(added[i][field])
+            elif i not in drop:
+                for field in DATA_FIELDS:
+                    merged[field].append(data[field][i])
+        return merged, len(added)
+
+    def get_stats(self):
+        """Share of lines and pixels that needed EasyOCR"""
+        with self._lock:
+            return {
+                'lines': self.lines,
+                'weak_lines': self.weak_lines,
+                'replaced_lines': self.replaced_lines,
+                'easyocr_pixel_fraction': self.weak_pixels / self.pixels if self.pixels else 0.0,
+            }
+
+    def close(self):
+        self.primary.close()
+        if self._secondary is not None:
+            self._secondary.close()
+
+ENGINES = {
+    TesseractSubprocessEngine.name: TesseractSubprocessEngine,
+    TesseractAPIEngine.name: TesseractAPIEngine,
+    EasyOCREngine.name: EasyOCREngine,
+    CascadeEngine.name: CascadeEngine,
+}
+
+def create_engine(name, language='eng', **options):
+    """
+    Create an OCR engine by name
+
+    Args:
+        name (str): One of ENGINES ('tesseract', 'tesseract-api', 'easyocr', 'cascade')
+        language (str): Tesseract language code
+        **options: Engine specific settings, e.g. batch_size for EasyOCR
+            or cutoff for the cascade
+
+    Returns:
+        OCREngine: Initialized engine
+    """
+    try:
+        engine_class = ENGINES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown OCR engine '{name}'. Available: {', '.join(ENGINES)}")
+    return engine_class(language, **options)
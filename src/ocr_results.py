@@ -0,0 +1,51 @@
+"""
+Result structures shared by the OCR pipeline
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional
+
+@dataclass
+class PageResult:
+    """OCR result for a single page"""
+    page_number: int
+    text: str = ""
+    confidence: float = 0.0
+    source: str = "ocr"  # 'ocr', 'text_layer', 'page_cache', 'blank' or 'failed'
+    dpi: Optional[int] = None  # Resolution the page was OCR'd at
+    # {'text', 'confidence', 'box': [x, y, width, height]} per recognized word
+    words: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: Optional[float] = None  # Time spent OCRing the page
+    fallback: Optional[str] = None  # 'downscaled' when the full page ran out of time
+    # {'reason', 'stage', 'elapsed', 'detail'} for failed pages
+    failure: Optional[Dict[str, Any]] = None
+
+@dataclass
+class DocumentResult:
+    """OCR result for a whole document"""
+    text: str = ""
+    confidence: float = 0.0
+    pages: List[PageResult] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_pages(cls, pages: List[PageResult]) -> "DocumentResult":
+        """Join page results in page order, skipping pages without text"""
+        pages = sorted(pages, key=lambda page: page.page_number)
+        text_pages = [page for page in pages if page.text.strip()]
+
+        text = "\n\n".join(f"--- Page {page.page_number} ---\n{page.text}" for page in text_pages)
+        confidence = sum(page.confidence for page in text_pages) / len(text_pages) if text_pages else 0.0
+
+        return cls(text=text, confidence=confidence, pages=pages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON serialization"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentResult":
+        """Rebuild a result serialized with to_dict"""
+        data = dict(data)
+        data['pages'] = [PageResult(**page) for page in data.get('pages', [])]
+        return cls(**data)
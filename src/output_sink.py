@@ -0,0 +1,243 @@
+"""
+Consolidated output: OCR records appended to rolling JSONL or Parquet shards
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# pyarrow takes a while to import, so ParquetSink only loads it when used
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+class ShardSink:
+    """
+    Appends one record per document to size-limited shard files
+
+    A shard is written as ``<name>.partial`` and only renamed to its final
+    name after it has been flushed and fsynced, so readers that glob for
+    complete shards never see a half-written one. Callbacks passed to
+    write() run once the shard holding their record is durable; the batch
+    manifest uses them to mark files done only after their output is safe.
+    Shard names carry a run id, so concurrent jobs and resumed runs never
+    write to the same file.
+    """
+
+    extension = None
+
+    def __init__(self, output_dir, prefix="ocr", max_records=10000, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            output_dir (str): Directory the shards are written to
+            prefix (str): Shard file name prefix
+            max_records (int): Records per shard before rolling over
+            max_bytes (int): Approximate shard size before rolling over
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+        self.shards_written = 0
+        self.records_written = 0
+        self._shard_index = 0
+        self._records = 0
+        self._bytes = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def _shard_path(self):
+        return self.output_dir / f"{self.prefix}-{self.run_id}-{self._shard_index:05d}{self.extension}"
+
+    def write(self, record, on_commit=None):
+        """
+        Append a record to the current shard
+
+        Args:
+            record (dict): JSON-serializable record
+            on_commit (callable): Called with the shard path once it is durable
+
+        Returns:
+            Path: Final path of the shard holding the record
+        """
+        committed = None
+        with self._lock:
+            shard = self._shard_path()
+            self._bytes += self._append(record)
+            self._records += 1
+            if on_commit is not None:
+                self._callbacks.append(on_commit)
+            if self._records >= self.max_records or self._bytes >= self.max_bytes:
+                committed = self._commit()
+        self._notify(committed)
+        return shard
+
+    def flush(self):
+        """Close the current shard early, e.g. at the end of a batch"""
+        committed = None
+        with self._lock:
+            if self._records:
+                committed = self._commit()
+        self._notify(committed)
+
+    def close(self):
+        self.flush()
+
+    def _commit(self):
+        shard = self._shard_path()
+        self._finish(shard)
+        self.shards_written += 1
+        self.records_written += self._records
+
+        callbacks, self._callbacks = self._callbacks, []
+        self._shard_index += 1
+        self._records = 0
+        self._bytes = 0
+        return shard, callbacks
+
+    @staticmethod
+    def _notify(committed):
+        """Run commit callbacks outside the lock so slow ones don't block writers"""
+        if committed is None:
+            return
+        shard, callbacks = committed
+        for callback in callbacks:
+            callback(shard)
+
+    @staticmethod
+    def _fsync_rename(partial, shard):
+        with open(partial, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(partial, shard)
+
+    def _append(self, record):
+        """Buffer a record, returning its approximate size in bytes"""
+        raise NotImplementedError
+
+    def _finish(self, shard):
+        """Write out, fsync and publish the current shard under ``shard``"""
+        raise NotImplementedError
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'shards': self.shards_written,
+                'records': self.records_written,
+                'pending_records': self._records,
+            }
+
+class JSONLSink(ShardSink):
+    """JSON Lines shards written through a large buffered file handle"""
+
+    extension = '.jsonl'
+
+    def __init__(self, output_dir, prefix="ocr", max_records=10000, max_bytes=256 * 1024 * 1024,
+                 buffer_size=1024 * 1024):
+        """
+        Args:
+            buffer_size (int): Write buffer, records reach the disk in chunks of this size
+        """
+        super().__init__(output_dir, prefix, max_records, max_bytes)
+        self.buffer_size = buffer_size
+        self._file = None
+
+    def _append(self, record):
+        if self._file is None:
+            partial = self._shard_path().with_name(self._shard_path().name + '.partial')
+            self._file = open(partial, 'w', encoding='utf-8', buffering=self.buffer_size)
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._file.write(line)
+        return len(line)
+
+    def _finish(self, shard):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        partial = self._file.name
+        self._file.close()
+        self._file = None
+        os.replace(partial, shard)
+
+class ParquetSink(ShardSink):
+    """
+    Parquet shards, one row group per shard
+
+    Records are held in memory until the shard rolls over. Nested dicts with
+    free-form keys (metadata, settings, timings) are stored as JSON strings
+    and the rest follows a fixed schema, so every shard has the same one.
+    """
+
+    extension = '.parquet'
+    json_columns = ('metadata', 'settings', 'timings')
+
+    def __init__(self, output_dir, prefix="ocr", max_records=10000, max_bytes=256 * 1024 * 1024):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet output requires pyarrow. Install with: pip install pyarrow")
+        super().__init__(output_dir, prefix, max_records, max_bytes)
+        self._rows = []
+
+    def _append(self, record):
+        row = dict(record)
+        for column in self.json_columns:
+            if column in row:
+                row[column] = json.dumps(row[column], ensure_ascii=False)
+        self._rows.append(row)
+        # Text dominates the size; close enough to bound memory per shard
+        return len(record.get('text', '')) + sum(len(page.get('text', '')) for page in record.get('pages', []))
+
+    @staticmethod
+    def schema():
+        import pyarrow as pa
+
+        word = pa.struct([
+            ('text', pa.string()), ('confidence', pa.float64()), ('box', pa.list_(pa.int32()))
+        ])
+        failure = pa.struct([
+            ('reason', pa.string()), ('stage', pa.string()), ('elapsed', pa.float64()),
+            ('detail', pa.string())
+        ])
+        page = pa.struct([
+            ('page_number', pa.int32()), ('text', pa.string()), ('confidence', pa.float64()),
+            ('source', pa.string()), ('dpi', pa.int32()), ('words', pa.list_(word)),
+            ('seconds', pa.float64()), ('fallback', pa.string()), ('failure', failure)
+        ])
+        return pa.schema([
+            ('source', pa.string()), ('output', pa.string()), ('text', pa.string()),
+            ('confidence', pa.float64()), ('pages', pa.list_(page)), ('metadata', pa.string()),
+            ('settings', pa.string()), ('timings', pa.string()), ('processed_at', pa.string())
+        ])
+
+    def _finish(self, shard):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        partial = shard.with_name(shard.name + '.partial')
+        table = pa.Table.from_pylist(self._rows, schema=self.schema())
+        pq.write_table(table, partial, compression='zstd')
+        self._rows = []
+        self._fsync_rename(partial, shard)
+
+SINKS = {
+    'jsonl': JSONLSink,
+    'parquet': ParquetSink,
+}
+
+def create_sink(output_format, output_dir, **options):
+    """
+    Create an output sink by format name
+
+    Args:
+        output_format (str): One of SINKS ('jsonl', 'parquet')
+        output_dir (str): Directory the shards are written to
+
+    Returns:
+        ShardSink: Sink ready for write()
+    """
+    try:
+        sink_class = SINKS[output_format.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown output format '{output_format}'. Available: {', '.join(SINKS)}")
+    return sink_class(output_dir, **options)
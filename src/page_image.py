@@ -0,0 +1,138 @@
+"""
+Single-buffer page image shared by every stage of the OCR pipeline
+"""
+
+import cv2
+import numpy as np
+from PIL import Image
+
+class PageImage:
+    """
+    A page decoded once into one contiguous uint8 numpy buffer
+
+    Layout analysis, blank detection, page hashing, enhancement and the OCR
+    engines all read views of the same array instead of converting between
+    PIL and OpenCV at every step. The grayscale plane is derived once and
+    cached; pages decoded as grayscale use the buffer itself.
+    """
+
+    def __init__(self, pixels, source_mode=None):
+        """
+        Args:
+            pixels (ndarray): HxW grayscale or HxWx3 RGB uint8 array
+            source_mode (str): PIL mode the page was decoded from
+        """
+        self.pixels = pixels
+        self.source_mode = source_mode
+        self._gray = None
+
+    @classmethod
+    def from_pil(cls, image, grayscale=True):
+        """
+        Decode a PIL image into a PageImage
+
+        Args:
+            image: PIL Image
+            grayscale (bool): Keep only the luminance plane, which is all
+                the OCR pipeline reads and a third of the RGB memory
+        """
+        source_mode = image.mode
+        mode = 'L' if grayscale or image.mode in ('L', '1', 'I', 'I;16', 'F', 'LA') else 'RGB'
+        if image.mode != mode:
+            image = image.convert(mode)
+        return cls(np.asarray(image), source_mode)
+
+    @classmethod
+    def open(cls, path, grayscale=True):
+        """Decode an image file into a PageImage"""
+        with Image.open(path) as image:
+            return cls.from_pil(image, grayscale)
+
+    @property
+    def size(self):
+        """(width, height), like PIL's Image.size"""
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+    @property
+    def is_color(self):
+        return self.pixels.ndim == 3
+
+    @property
+    def gray(self):
+        """Grayscale plane, computed on first use and shared afterwards"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.pixels, cv2.COLOR_RGB2GRAY) if self.is_color else self.pixels
+        return self._gray
+
+    def enhance(self, contrast=1.2, sharpness=None, alpha=1.2, beta=10):
+        """
+        Contrast/sharpness enhancement and OCR preprocessing in fused passes
+
+        Reproduces ImageEnhance.Contrast, ImageEnhance.Sharpness and the
+        convertScaleAbs preprocessing on the grayscale plane. The per-pixel
+        steps are folded into lookup tables, so each output buffer is
+        written by a single cv2.LUT (plus one 3x3 filter when sharpening).
+
+        Args:
+            contrast (float): ImageEnhance.Contrast factor (1.0 leaves it unchanged)
+            sharpness (float): ImageEnhance.Sharpness factor, None to skip
+            alpha (float): Preprocessing gain
+            beta (float): Preprocessing offset
+
+        Returns:
+            tuple: (enhanced gray array, preprocessed gray array)
+        """
+        gray = self.gray
+        values = np.arange(256, dtype=np.float32)
+
+        # ImageEnhance.Contrast blends towards the mean grey level
+        mean = int(cv2.mean(gray)[0] + 0.5)
+        contrast_lut = np.clip(mean + contrast * (values - mean), 0, 255).astype(np.uint8)
+        scale_lut = np.clip(np.abs(alpha * values + beta), 0, 255).astype(np.uint8)
+
+        enhanced = cv2.LUT(gray, contrast_lut)
+        if sharpness is None:
+            # Both LUTs composed: one pass straight from the source plane
+            processed = cv2.LUT(gray, scale_lut[contrast_lut])
+            return enhanced, processed
+
+        # ImageEnhance.Sharpness blends with PIL's SMOOTH filter; folded into one kernel
+        smooth = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+        identity = np.zeros((3, 3), dtype=np.float32)
+        identity[1, 1] = 1
+        kernel = sharpness * identity + (1 - sharpness) * smooth
+        cv2.filter2D(enhanced, -1, kernel, dst=enhanced, borderType=cv2.BORDER_REPLICATE)
+
+        processed = cv2.LUT(enhanced, scale_lut)
+        return enhanced, processed
+
+def get_frame_count(path):
+    """Frames in an image file, more than one for multi-page TIFFs"""
+    with Image.open(path) as image:
+        return getattr(image, 'n_frames', 1)
+
+def iter_image_frames(path, grayscale=True):
+    """
+    Decode the frames of a multi-page image one at a time
+
+    Only the current frame is decoded, so a long fax costs the memory of the
+    pages the consumer still holds. Frames scanned with different
+    horizontal and vertical resolution (204x98 dpi "normal" fax mode) are
+    stretched to square pixels, which Tesseract and EasyOCR expect.
+
+    Args:
+        path (str): Image file, typically a multi-page TIFF
+        grayscale (bool): See PageImage.from_pil
+
+    Yields:
+        tuple: (page number starting at 1, PageImage)
+    """
+    with Image.open(path) as image:
+        for index in range(getattr(image, 'n_frames', 1)):
+            image.seek(index)
+            frame = image
+            x_dpi, y_dpi = (float(value) for value in image.info.get('dpi', (0, 0)))
+            if x_dpi and y_dpi and abs(x_dpi - y_dpi) / max(x_dpi, y_dpi) > 0.1:
+                width, height = image.size
+                frame = image.convert('L').resize((width, round(height * x_dpi / y_dpi)), Image.BILINEAR)
+            yield index + 1, PageImage.from_pil(frame, grayscale)
@@ -0,0 +1,131 @@
+"""
+Page-by-page PDF rasterization and native text-layer extraction
+"""
+
+import re
+import subprocess
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from page_image import PageImage
+
+# Embedded images covering at least this many square inches make a page
+# count as scanned/mixed, so it still goes through OCR
+MIN_SCAN_IMAGE_AREA_SQ_IN = 20.0
+
+def get_page_count(pdf_path):
+    """Number of pages in a PDF, read with poppler's pdfinfo"""
+    return int(pdfinfo_from_path(str(pdf_path))['Pages'])
+
+def _page_runs(page_numbers, window):
+    """Split sorted page numbers into consecutive runs of at most ``window`` pages"""
+    run = []
+    for page_number in page_numbers:
+        if run and (page_number != run[-1] + 1 or len(run) >= window):
+            yield run[0], run[-1]
+            run = []
+        run.append(page_number)
+    if run:
+        yield run[0], run[-1]
+
+def iter_pdf_pages(pdf_path, dpi=300, window=1, page_numbers=None):
+    """
+    Render a PDF lazily, a few pages at a time
+
+    Only ``window`` page bitmaps are rendered per poppler call, so memory no
+    longer grows with the page count. Pages are rendered by poppler as
+    grayscale PGM (a third of the RGB size) and handed on as PageImage
+    buffers, skipping any encode/decode round trip.
+
+    Args:
+        pdf_path (str): Path to the PDF
+        dpi (int): Rendering resolution
+        window (int): Pages rendered per poppler call
+        page_numbers (iterable): Pages to render (defaults to all pages)
+
+    Yields:
+        tuple: (page number starting at 1, PageImage)
+    """
+    if page_numbers is None:
+        page_numbers = range(1, get_page_count(pdf_path) + 1)
+
+    for first_page, last_page in _page_runs(sorted(page_numbers), window):
+        images = convert_from_path(
+            str(pdf_path), dpi=dpi, fmt='ppm', grayscale=True,
+            first_page=first_page, last_page=last_page
+        )
+        for offset in range(len(images)):
+            page = PageImage.from_pil(images[offset])
+            # Drop the PIL copy so only the numpy buffer stays alive
+            images[offset] = None
+            yield first_page + offset, page
+        del images
+
+def render_pdf_page(pdf_path, page_number, dpi=300):
+    """Render a single PDF page as a PageImage"""
+    return PageImage.from_pil(convert_from_path(
+        str(pdf_path), dpi=dpi, fmt='ppm', grayscale=True,
+        first_page=page_number, last_page=page_number
+    )[0])
+
+def extract_text_layer(pdf_path):
+    """
+    Pull the embedded text of every page with poppler's pdftotext
+
+    Args:
+        pdf_path (str): Path to the PDF
+
+    Returns:
+        list: Text per page, index 0 is page 1
+    """
+    output = subprocess.run(
+        ['pdftotext', '-layout', '-enc', 'UTF-8', str(pdf_path), '-'],
+        capture_output=True, check=True
+    ).stdout.decode('utf-8', errors='replace')
+
+    # pdftotext terminates every page with a form feed
+    pages = output.split('\f')
+    if pages and not pages[-1].strip():
+        pages.pop()
+    return pages
+
+def find_scanned_pages(pdf_path, min_area=MIN_SCAN_IMAGE_AREA_SQ_IN):
+    """
+    Find pages carrying large raster images, using poppler's pdfimages
+
+    Small logos and signatures are ignored; a page whose images cover at
+    least ``min_area`` square inches is treated as scanned or mixed content.
+
+    Returns:
+        set: Page numbers with significant image content
+    """
+    output = subprocess.run(
+        ['pdfimages', '-list', str(pdf_path)],
+        capture_output=True, check=True
+    ).stdout.decode('utf-8', errors='replace')
+
+    image_area = {}
+    # Skip the header and separator lines
+    for line in output.splitlines()[2:]:
+        columns = line.split()
+        try:
+            page, width, height = int(columns[0]), int(columns[3]), int(columns[4])
+            x_ppi, y_ppi = float(columns[12]), float(columns[13])
+        except (IndexError, ValueError):
+            continue
+        if x_ppi > 0 and y_ppi > 0:
+            image_area[page] = image_area.get(page, 0.0) + (width / x_ppi) * (height / y_ppi)
+
+    return {page for page, area in image_area.items() if area >= min_area}
+
+def is_usable_text(text, min_chars=50):
+    """
+    Check whether a native text layer is good enough to skip OCR
+
+    Requires a minimum number of alphanumeric characters and rejects text
+    that is mostly symbols, which is what broken font encodings produce.
+    Unmapped glyphs ("(cid:12)" escapes) don't count as text.
+    """
+    text = re.sub(r'\(cid:\d+\)', '', text)
+    visible = [c for c in text if not c.isspace()]
+    alnum = sum(1 for c in visible if c.isalnum())
+    return bool(visible) and alnum >= min_chars and alnum / len(visible) >= 0.5
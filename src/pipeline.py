@@ -0,0 +1,165 @@
+"""
+Streaming OCR-to-index pipeline: OCR workers feed the vector database directly
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+
+from tqdm import tqdm
+
+class IndexingPipeline:
+    """
+    Ingest a directory into a VectorDatabase in one pass
+
+    OCR runs in the processor's parallel batch workers. A feeder thread
+    moves finished documents into a bounded queue, and the calling thread
+    saves each output and embeds documents in fixed-size batches. When the
+    embedder falls behind, the full queue stops the feeder, which in turn
+    stops new files from being submitted, so memory stays bounded.
+
+    Every ``checkpoint_every`` documents the index is saved and the output
+    shards are flushed. Only then are those files marked done in the job
+    manifest, so an interrupted run resumes from the last checkpoint
+    without losing or duplicating documents. Files are recorded under a key
+    that includes the index path, in their own manifest by default, so
+    files OCR'd by a plain batch run or indexed into another database are
+    not skipped.
+    """
+
+    _DONE = object()
+
+    def __init__(self, ocr_processor, vector_db, embed_batch_size=32, queue_size=64,
+                 checkpoint_every=500):
+        """
+        Args:
+            ocr_processor (OCRProcessor): Runs OCR and writes outputs
+            vector_db (VectorDatabase): Index the documents are added to
+            embed_batch_size (int): Documents embedded per encoder call
+            queue_size (int): OCR results allowed to wait for embedding
+            checkpoint_every (int): Documents between index saves
+        """
+        self.ocr = ocr_processor
+        self.vector_db = vector_db
+        self.embed_batch_size = embed_batch_size
+        self.queue_size = queue_size
+        self.checkpoint_every = checkpoint_every
+        self.job = f"index:{Path(vector_db.db_path).resolve()}"
+
+        self.stats = {'documents': 0, 'indexed': 0, 'empty': 0, 'failed': 0,
+                      'checkpoints': 0, 'embed_seconds': 0.0}
+
+    def _feed(self, results, out_queue):
+        """Feeder thread: OCR results into the bounded queue"""
+        try:
+            for item in results:
+                out_queue.put(item)
+        except Exception as e:
+            out_queue.put(e)
+        finally:
+            out_queue.put(self._DONE)
+
+    def run(self, input_dir, max_workers=None, executor='thread', chunksize=None,
+            incremental=False, manifest_path=None):
+        """
+        OCR every supported file under input_dir and index its text
+
+        Args:
+            input_dir (str): Directory containing files to process
+            max_workers (int): Parallel OCR workers (defaults to the CPU budget)
+            executor (str): 'thread' or 'process', see OCRProcessor.batch_process
+            chunksize (int): Files handed to a worker process at a time
+            incremental (bool): Skip files already indexed with unchanged content
+            manifest_path (str): Job manifest database (defaults to
+                index_manifest.sqlite in the processor's output_dir)
+
+        Returns:
+            dict: Document counts, checkpoints and throughput
+        """
+        if incremental and manifest_path is None:
+            manifest_path = Path(self.ocr.output_dir) / 'index_manifest.sqlite'
+        files, output_stems, manifest = self.ocr.prepare_batch(input_dir, incremental, manifest_path, self.job)
+        if not files:
+            return self.stats
+
+        start = time.perf_counter()
+        max_workers = max_workers or self.ocr.budget.slots
+        results = self.ocr.iter_batch_results(files, max_workers, executor, chunksize,
+                                              max_in_flight=max_workers * 2)
+        out_queue = queue.Queue(maxsize=self.queue_size)
+        feeder = threading.Thread(target=self._feed, args=(results, out_queue),
+                                  name='ocr-index-feeder', daemon=True)
+        feeder.start()
+
+        batch = []        # (file path, result, outputs) waiting to be embedded
+        finished = []     # (file path, result, outputs) waiting for a checkpoint
+        since_checkpoint = 0
+
+        with tqdm(total=len(files), desc="OCR + indexing") as progress:
+            while True:
+                item = out_queue.get()
+                if item is self._DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                file_path, result = item
+                # Filled with the output path once it is on disk; shard
+                # outputs only get there when the shard is published
+                outputs = []
+                self.ocr.save_batch_result(file_path, result, output_stems[file_path], outputs.append)
+                progress.update(1)
+                self.stats['documents'] += 1
+
+                if 'error' in result.metadata:
+                    self.stats['failed'] += 1
+                    finished.append((file_path, result, outputs))
+                elif not result.text.strip():
+                    self.stats['empty'] += 1
+                    finished.append((file_path, result, outputs))
+                else:
+                    batch.append((file_path, result, outputs))
+
+                if len(batch) >= self.embed_batch_size:
+                    finished.extend(self._embed(batch))
+                    since_checkpoint += len(batch)
+                    batch = []
+                if since_checkpoint >= self.checkpoint_every:
+                    self._checkpoint(manifest, finished)
+                    finished, since_checkpoint = [], 0
+
+        feeder.join()
+        finished.extend(self._embed(batch))
+        self._checkpoint(manifest, finished)
+
+        elapsed = time.perf_counter() - start
+        self.stats['seconds'] = round(elapsed, 2)
+        self.stats['embed_seconds'] = round(self.stats['embed_seconds'], 2)
+        self.stats['documents_per_sec'] = round(self.stats['documents'] / elapsed, 2) if elapsed else 0.0
+        return self.stats
+
+    def _embed(self, batch):
+        """Embed and index one batch of documents"""
+        if not batch:
+            return []
+        start = time.perf_counter()
+        self.vector_db.add_documents(
+            [result.text for _, result, _ in batch],
+            [str(file_path) for file_path, _, _ in batch],
+            [result.confidence for _, result, _ in batch],
+            batch_size=self.embed_batch_size
+        )
+        self.stats['embed_seconds'] += time.perf_counter() - start
+        self.stats['indexed'] += len(batch)
+        return batch
+
+    def _checkpoint(self, manifest, finished):
+        """Make outputs and index durable, then mark their files done"""
+        if self.ocr.sink is not None:
+            self.ocr.sink.flush()
+        self.vector_db.save()
+        self.stats['checkpoints'] += 1
+
+        for file_path, result, outputs in finished:
+            self.ocr.record_in_manifest(manifest, file_path, result, outputs[0] if outputs else None, self.job)
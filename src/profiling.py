@@ -0,0 +1,177 @@
+"""
+Opt-in per-request profiling for the API
+
+Off unless enabled through the environment:
+    OCR_PROFILE_SAMPLE_RATE  fraction of requests profiled at random (default 0)
+    OCR_PROFILE_HEADER       '1' to profile requests sent with ``X-Profile: 1``
+    OCR_PROFILE_MODE         'sample' (collapsed stacks) or 'cprofile' (pstats)
+    OCR_PROFILE_DIR          where artifacts are written (default 'profiles')
+
+Each profiled request leaves ``<request id>.collapsed`` or
+``<request id>.pstats`` plus a ``<request id>.json`` summary in the
+profile directory.
+"""
+
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_HEADER = 'x-profile'
+REQUEST_ID_HEADER = 'x-request-id'
+MODES = ('sample', 'cprofile')
+
+# Frames from this directory mark a sampled stack as doing pipeline work
+_SRC_DIR = str(Path(__file__).resolve().parent)
+
+class StackSampler:
+    """
+    Samples the stacks of all threads into collapsed-stack counts
+
+    Unlike cProfile this sees the page and region worker threads, not only
+    the thread handling the request, and costs one stack walk per thread
+    per interval. Stacks without any frame from this package are idle pool
+    threads or the event loop waiting for I/O and are dropped. Other
+    requests running at the same time show up in the samples as well.
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack, busy = [], False
+                while frame is not None:
+                    code = frame.f_code
+                    busy = busy or code.co_filename.startswith(_SRC_DIR)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if busy:
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed format, one 'frame;frame;... count' line per stack"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class RequestProfiler:
+    """Decides which requests to profile and writes their artifacts"""
+
+    def __init__(self, output_dir='profiles', sample_rate=0.0, allow_header=False, mode='sample',
+                 interval=0.005):
+        """
+        Args:
+            output_dir (str): Directory for profile artifacts
+            sample_rate (float): Fraction of requests profiled at random
+            allow_header (bool): Profile requests that ask for it with X-Profile
+            mode (str): 'sample' for collapsed stacks of all threads,
+                'cprofile' for deterministic pstats of the request's thread
+            interval (float): Seconds between stack samples in 'sample' mode
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {MODES}")
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.allow_header = allow_header
+        self.mode = mode
+        self.interval = interval
+
+    @classmethod
+    def from_env(cls):
+        """Profiler configured by the OCR_PROFILE_* environment variables"""
+        return cls(
+            output_dir=os.environ.get('OCR_PROFILE_DIR', 'profiles'),
+            sample_rate=float(os.environ.get('OCR_PROFILE_SAMPLE_RATE', '0')),
+            allow_header=os.environ.get('OCR_PROFILE_HEADER', '') in ('1', 'true', 'yes'),
+            mode=os.environ.get('OCR_PROFILE_MODE', 'sample'),
+        )
+
+    @property
+    def enabled(self):
+        return self.allow_header or self.sample_rate > 0
+
+    def should_profile(self, headers):
+        """Whether a request with these headers is profiled"""
+        if self.allow_header and headers.get(PROFILE_HEADER, '') in ('1', 'true', 'yes'):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @staticmethod
+    def request_id(headers):
+        """The caller's X-Request-ID if it is safe as a file name, otherwise a new one"""
+        request_id = headers.get(REQUEST_ID_HEADER, '')
+        if re.fullmatch(r'[A-Za-z0-9._-]{1,64}', request_id) and not request_id.startswith('.'):
+            return request_id
+        return uuid.uuid4().hex
+
+    @contextmanager
+    def profile(self, request_id, **info):
+        """
+        Profile the block and write its artifacts
+
+        Args:
+            request_id (str): Names the artifact files
+            **info: Extra fields for the JSON summary, e.g. the path
+
+        Yields:
+            dict: Summary, the caller may add fields such as the status
+        """
+        summary = {'request_id': request_id, 'mode': self.mode, **info}
+        profiler = cProfile.Profile() if self.mode == 'cprofile' else StackSampler(self.interval)
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            profiler.enable()
+        else:
+            profiler.start()
+        try:
+            yield summary
+        finally:
+            if self.mode == 'cprofile':
+                profiler.disable()
+            else:
+                profiler.stop()
+            summary['seconds'] = round(time.perf_counter() - start, 4)
+            summary['timestamp'] = time.time()
+            self._write(request_id, profiler, summary)
+
+    def _write(self, request_id, profiler, summary):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == 'cprofile':
+            artifact = self.output_dir / f"{request_id}.pstats"
+            profiler.dump_stats(str(artifact))
+        else:
+            artifact = self.output_dir / f"{request_id}.collapsed"
+            artifact.write_text(profiler.collapsed())
+            summary['samples'] = profiler.samples
+        summary['artifact'] = artifact.name
+        (self.output_dir / f"{request_id}.json").write_text(json.dumps(summary, indent=2))
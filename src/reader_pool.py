@@ -0,0 +1,169 @@
+"""
+Shared pool of EasyOCR readers, loaded per language set on first use
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from metrics import MODEL_LOAD_SECONDS
+
+# config.py lives in the project root, which isn't on the path when
+# src/main.py is run directly
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from config import LANGUAGE_MAPPING
+
+def easyocr_languages(language):
+    """
+    EasyOCR language codes for a Tesseract language string
+
+    Args:
+        language (str): Tesseract code(s), e.g. 'eng' or 'eng+fra'
+
+    Returns:
+        tuple: Sorted EasyOCR codes, the reader pool key
+    """
+    codes = {LANGUAGE_MAPPING.get(code, code) for code in language.split('+') if code}
+    return tuple(sorted(codes or {'en'}))
+
+class ReaderPool:
+    """
+    EasyOCR readers keyed by language set, least recently used evicted first
+
+    Each reader holds a few hundred MB of detector and recognizer weights,
+    so a reader is only loaded the first time its languages are asked for,
+    and once the resident weights exceed ``max_bytes`` the readers unused
+    for longest are dropped. A reader still in use by a running call is
+    freed when that call returns. The most recently loaded reader is never
+    evicted, even if it alone exceeds the cap.
+    """
+
+    def __init__(self, max_bytes=None, gpu=False):
+        """
+        Args:
+            max_bytes (int): Resident model weight limit (None for no limit)
+            gpu (bool): Load the models on the GPU
+        """
+        self.max_bytes = max_bytes
+        self.gpu = gpu
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self._readers = OrderedDict()
+        self._sizes = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        """Cached reader marked as most recently used, caller holds the lock"""
+        reader = self._readers.get(key)
+        if reader is not None:
+            self._readers.move_to_end(key)
+            self.hits += 1
+        return reader
+
+    def get(self, languages):
+        """
+        Reader for a set of EasyOCR languages, loading it if needed
+
+        Args:
+            languages (tuple): EasyOCR codes, see easyocr_languages
+
+        Returns:
+            easyocr.Reader: Loaded reader
+        """
+        key = tuple(sorted(languages))
+        with self._lock:
+            reader = self._lookup(key)
+            if reader is not None:
+                return reader
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # One thread loads a language set, others asking for it wait for that load
+        with load_lock:
+            with self._lock:
+                reader = self._lookup(key)
+                if reader is not None:
+                    return reader
+
+            # Imported here: easyocr pulls in torch, which Tesseract-only runs never need
+            import easyocr
+
+            start = time.perf_counter()
+            reader = easyocr.Reader(list(key), gpu=self.gpu)
+            size = self.model_bytes(reader)
+            seconds = time.perf_counter() - start
+            MODEL_LOAD_SECONDS.labels(f"easyocr/{'+'.join(key)}").observe(seconds)
+
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += seconds
+                self._readers[key] = reader
+                self._sizes[key] = size
+                self._evict()
+        return reader
+
+    def _evict(self):
+        """Drop least recently used readers until the weights fit, caller holds the lock"""
+        if self.max_bytes is None:
+            return
+        while len(self._readers) > 1 and sum(self._sizes.values()) > self.max_bytes:
+            key, _ = self._readers.popitem(last=False)
+            del self._sizes[key]
+            self.evictions += 1
+
+    @staticmethod
+    def model_bytes(reader):
+        """Size of a reader's detector and recognizer weights"""
+        total = 0
+        for model in (getattr(reader, 'detector', None), getattr(reader, 'recognizer', None)):
+            parameters = getattr(model, 'parameters', None)
+            if parameters is not None:
+                total += sum(p.numel() * p.element_size() for p in parameters())
+        return total
+
+    def get_stats(self):
+        """Hit, load and eviction counts with the resident readers"""
+        with self._lock:
+            return {
+                'loaded': len(self._readers),
+                'resident_mb': sum(self._sizes.values()) / 1024 / 1024,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'load_seconds': self.load_seconds,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._readers.clear()
+            self._sizes.clear()
+
+# One pool per device, shared by every engine in the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_reader_pool(gpu=False, max_bytes=None):
+    """
+    Process-wide reader pool, so engines for different languages share one memory cap
+
+    Args:
+        gpu (bool): Device the pool's models are loaded on
+        max_bytes (int): Resident weight limit, replaces the pool's current one if given
+
+    Returns:
+        ReaderPool: Shared pool for the device
+    """
+    with _pools_lock:
+        pool = _pools.get(gpu)
+        if pool is None:
+            pool = _pools[gpu] = ReaderPool(max_bytes, gpu)
+        elif max_bytes is not None:
+            with pool._lock:
+                pool.max_bytes = max_bytes
+                pool._evict()
+        return pool
@@ -0,0 +1,235 @@
+"""
+CPU budgeting, thread limits and deadlines for parallel OCR work
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Threads one OCR call should get when nothing is configured. Tesseract's
+# OpenMP code barely speeds up a single page, so whole pages in parallel
+# scale better; torch kernels used by EasyOCR keep scaling to a few threads.
+ENGINE_THREADS = {
+    'tesseract': 1,
+    'tesseract-api': 1,
+    'cascade': 1,
+    'easyocr': 4,
+}
+
+# Environment read by the OpenMP/BLAS runtimes each engine family runs on:
+# Tesseract (its processes and tesserocr) honours OMP_THREAD_LIMIT, torch
+# under EasyOCR sizes its pools from the others
+ENGINE_THREAD_ENV = {
+    'tesseract': ('OMP_THREAD_LIMIT',),
+    'easyocr': ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'),
+}
+THREAD_ENV_VARS = ('OMP_THREAD_LIMIT', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+# Engine families each engine name runs
+_ENGINE_FAMILIES = {
+    'tesseract': ('tesseract',),
+    'tesseract-api': ('tesseract',),
+    'cascade': ('tesseract', 'easyocr'),
+    'easyocr': ('easyocr',),
+}
+
+# Limits the user exported before start-up are left alone
+_USER_THREAD_ENV = {name for name in THREAD_ENV_VARS if name in os.environ}
+
+def _cgroup_cpu_limit():
+    """CPUs allowed by the cgroup CPU quota, None without a quota"""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+def available_cpus():
+    """
+    CPUs this process can actually use
+
+    The smallest of the host CPU count, the CPU affinity mask and the
+    cgroup quota, so containers limited to a few cores don't size their
+    pools for the whole host.
+    """
+    cpus = os.cpu_count() or 1
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = min(cpus, len(os.sched_getaffinity(0)))
+    quota = _cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+def plan_threads(engine, workers=None, threads=None, cpus=None):
+    """
+    Split the available CPUs into concurrent OCR tasks and threads per task
+
+    Args:
+        engine (str): Engine name, picks the default threads per task
+        workers (int): Concurrent tasks, derived from threads if not given
+        threads (int): Intra-op threads per task, derived from workers if not given
+        cpus (int): CPUs to split (defaults to available_cpus())
+
+    Returns:
+        tuple: (workers, threads) with workers x threads close to cpus
+    """
+    cpus = cpus or available_cpus()
+    if workers and threads:
+        return workers, threads
+    if workers:
+        return workers, max(1, cpus // workers)
+    threads = min(threads or ENGINE_THREADS.get(engine, 1), cpus)
+    return max(1, cpus // threads), threads
+
+def apply_thread_limits(threads, engine):
+    """
+    Cap the threads every OCR call of the engine may start
+
+    Only the runtimes the engine runs on are limited, so models sharing the
+    process, such as the vector database's embedding model next to
+    Tesseract, keep their own thread pools. torch is limited only for
+    EasyOCR. The limits are process-wide, so this is called by the batch
+    and CLI entry points, not by OCRProcessor, and before the engine is
+    created: OpenMP in tesserocr reads its limit once, when it is loaded.
+    Variables the user exported before start-up take precedence.
+
+    Args:
+        threads (int): Intra-op threads per task
+        engine (str): Engine name, see ENGINE_THREADS
+    """
+    families = _ENGINE_FAMILIES.get(engine, ('tesseract',))
+    for family in families:
+        for name in ENGINE_THREAD_ENV[family]:
+            if name not in _USER_THREAD_ENV:
+                os.environ[name] = str(threads)
+    if 'easyocr' in families and 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+    if 'cv2' in sys.modules:
+        sys.modules['cv2'].setNumThreads(threads)
+
+def thread_candidates(cpus=None):
+    """
+    Workers x threads settings worth trying on this host
+
+    Returns:
+        list: (workers, threads) pairs from all-workers to all-threads
+    """
+    cpus = cpus or available_cpus()
+    candidates = []
+    threads = 1
+    while threads <= cpus:
+        candidates.append((cpus // threads, threads))
+        threads *= 2
+    return candidates
+
+def autotune_threads(run_sample, candidates=None, warmup=True):
+    """
+    Pick the workers x threads setting with the best throughput
+
+    Args:
+        run_sample (callable): Called as run_sample(workers, threads); OCRs a
+            sample corpus and returns the number of pages processed
+        candidates (list): (workers, threads) pairs (defaults to thread_candidates())
+        warmup (bool): Run the first candidate once untimed so model loading
+            and file caching don't count against it
+
+    Returns:
+        dict: Best 'workers', 'threads' and 'pages_per_sec', plus every
+            candidate's measurement under 'results'
+    """
+    candidates = candidates or thread_candidates()
+    if warmup:
+        run_sample(*candidates[0])
+
+    results = []
+    for workers, threads in candidates:
+        start = time.perf_counter()
+        pages = run_sample(workers, threads)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'workers': workers,
+            'threads': threads,
+            'pages_per_sec': pages / elapsed if elapsed else 0.0,
+        })
+
+    best = max(results, key=lambda result: result['pages_per_sec'])
+    return {**best, 'results': results}
+
+class WorkBudget:
+    """
+    Shared cap on OCR work units running at the same time
+
+    File tasks and page tasks both take a slot only while they do CPU-heavy
+    work (preprocessing and recognition), never while they wait on other
+    tasks, so nested fan-out cannot deadlock and never oversubscribes the CPU.
+    The semaphore can be a multiprocessing one to share the budget between
+    pool worker processes.
+    """
+
+    def __init__(self, slots=None, semaphore=None):
+        """
+        Args:
+            slots (int): Concurrent work units allowed (defaults to available_cpus())
+            semaphore: Existing semaphore to share, e.g. multiprocessing.BoundedSemaphore
+        """
+        self.slots = slots or available_cpus()
+        self._semaphore = semaphore or threading.BoundedSemaphore(self.slots)
+
+    @contextmanager
+    def slot(self):
+        """Hold one budget slot for the duration of the block"""
+        self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+class Deadline:
+    """
+    Point in time by which a unit of OCR work has to finish
+
+    Page deadlines are capped by their document's deadline, so a document
+    timeout also stops the pages that are still running.
+    """
+
+    def __init__(self, seconds=None, parent=None):
+        """
+        Args:
+            seconds (float): Time allowed from now (None or 0 for no limit)
+            parent (Deadline): Enclosing deadline that also applies
+        """
+        expires = time.monotonic() + seconds if seconds else None
+        if parent is not None and parent.expires is not None:
+            expires = parent.expires if expires is None else min(expires, parent.expires)
+        self.expires = expires
+        self.started = time.monotonic()
+
+    def remaining(self):
+        """Seconds left, None without a limit"""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def elapsed(self):
+        return time.monotonic() - self.started
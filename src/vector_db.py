@@ -8,11 +8,12 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import faiss
-from sentence_transformers import SentenceTransformer
 import pickle
 from dataclasses import dataclass
 from datetime import datetime
 
+from metrics import STAGE_SECONDS, MODEL_LOAD_SECONDS
+
 @dataclass
 class DocumentMetadata:
     """Document metadata structure"""
@@ -29,8 +30,10 @@ class VectorDatabase:
         self.db_path = Path(db_path)
         self.db_path.mkdir(exist_ok=True)
         
-        # Initialize embedding model
-        self.model = SentenceTransformer(model_name)
+        # Initialize embedding model; imported here since it loads torch
+        from sentence_transformers import SentenceTransformer
+        with MODEL_LOAD_SECONDS.labels(f'sentence-transformers/{model_name}').time():
+            self.model = SentenceTransformer(model_name)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         
         # Initialize FAISS index
@@ -52,13 +55,21 @@ class VectorDatabase:
             print(f"Loaded database with {len(self.metadata)} documents")
     
     def _save_database(self):
-        """Save database to disk"""
+        """Save database to disk, replacing each file atomically"""
         index_path = self.db_path / "faiss_index.bin"
         metadata_path = self.db_path / "metadata.pkl"
         
-        faiss.write_index(self.index, str(index_path))
-        with open(metadata_path, 'wb') as f:
+        # Written next to the target and renamed, so a crash mid-save never
+        # leaves a truncated index or metadata file behind
+        index_tmp = index_path.with_suffix(".bin.tmp")
+        metadata_tmp = metadata_path.with_suffix(".pkl.tmp")
+        faiss.write_index(self.index, str(index_tmp))
+        with open(metadata_tmp, 'wb') as f:
             pickle.dump(self.metadata, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_tmp, index_path)
+        os.replace(metadata_tmp, metadata_path)
     
     def _detect_document_type(self, text: str) -> str:
         """Simple document type detection based on keywords"""
@@ -79,27 +90,44 @@ class VectorDatabase:
     
     def add_document(self, text: str, file_path: str, confidence_score: float = 0.0):
         """Add a document to the vector database"""
-        # Generate embedding
-        embedding = self.model.encode([text], normalize_embeddings=True)
-        
-        # Detect document type
-        doc_type = self._detect_document_type(text)
-        
-        # Create metadata
-        metadata = DocumentMetadata(
-            file_path=file_path,
-            document_type=doc_type,
-            confidence_score=confidence_score,
-            processed_date=datetime.now().isoformat(),
-            text_preview=text[:200] + "..." if len(text) > 200 else text
-        )
+        index = self.add_documents([text], [file_path], [confidence_score])[0]
+        doc_type = self.metadata[index].document_type
+        print(f"Added {doc_type} document: {Path(file_path).name}")
+        return index
+    
+    def add_documents(self, texts: List[str], file_paths: List[str],
+                      confidence_scores: Optional[List[float]] = None,
+                      batch_size: int = 32) -> List[int]:
+        """
+        Add several documents with one batched embedding pass
+        
+        Returns:
+            List[int]: Index positions of the added documents
+        """
+        if not texts:
+            return []
+        if confidence_scores is None:
+            confidence_scores = [0.0] * len(texts)
+        
+        # Generate embeddings
+        with STAGE_SECONDS.labels('vector_db', 'embed').time():
+            embeddings = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        
+        start = len(self.metadata)
+        now = datetime.now().isoformat()
+        for text, file_path, confidence_score in zip(texts, file_paths, confidence_scores):
+            self.metadata.append(DocumentMetadata(
+                file_path=file_path,
+                document_type=self._detect_document_type(text),
+                confidence_score=confidence_score,
+                processed_date=now,
+                text_preview=text[:200] + "..." if len(text) > 200 else text
+            ))
         
         # Add to index
-        self.index.add(embedding.astype(np.float32))
-        self.metadata.append(metadata)
-        
-        print(f"Added {doc_type} document: {Path(file_path).name}")
-        return len(self.metadata) - 1
+        with STAGE_SECONDS.labels('vector_db', 'index').time():
+            self.index.add(np.asarray(embeddings, dtype=np.float32))
+        return list(range(start, len(self.metadata)))
     
     def search_similar(self, query: str, k: int = 5) -> List[Tuple[DocumentMetadata, float]]:
         """Search for similar documents"""
@@ -107,10 +135,12 @@ class VectorDatabase:
             return []
         
         # Generate query embedding
-        query_embedding = self.model.encode([query], normalize_embeddings=True)
+        with STAGE_SECONDS.labels('vector_db', 'embed').time():
+            query_embedding = self.model.encode([query], normalize_embeddings=True)
         
         # Search
-        scores, indices = self.index.search(query_embedding.astype(np.float32), min(k, self.index.ntotal))
+        with STAGE_SECONDS.labels('vector_db', 'search').time():
+            scores, indices = self.index.search(query_embedding.astype(np.float32), min(k, self.index.ntotal))
         
         results = []
         for score, idx in zip(scores[0], indices[0]):
@@ -137,7 +167,8 @@ class VectorDatabase:
     
     def save(self):
         """Save database to disk"""
-        self._save_database()
+        with STAGE_SECONDS.labels('vector_db', 'save').time():
+            self._save_database()
         print(f"Database saved to {self.db_path}")
 
 class DocumentIndexer:
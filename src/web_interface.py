@@ -17,9 +17,12 @@ from pathlib import Path
 src_path = Path(__file__).parent
 sys.path.insert(0, str(src_path))
 
-from api import extract_entities
+from api import extract_entities, get_vector_db, get_metrics, track_requests, profile_requests, profiler
 
 app = FastAPI(title="Document Processing Web Interface")
+track_requests(app, "web")
+profile_requests(app, profiler, {"/upload"})
+app.add_api_route("/metrics", get_metrics, methods=["GET"])
 
 # Setup templates and static files
 templates = Jinja2Templates(directory="templates")
@@ -59,9 +62,8 @@ async def upload_files(request: Request, files: List[UploadFile] = File(...)):
 @app.get("/api/stats")
 async def get_stats():
     """Get database statistics for web interface"""
-    from vector_db import VectorDatabase
-    db = VectorDatabase("api_vector_db")
-    return db.get_stats()
+    # Shared with the API, the embedding model is loaded once
+    return get_vector_db().get_stats()
 
 if __name__ == "__main__":
     import uvicorn